@@ -2,6 +2,21 @@ import streamlit as st
 import random
 import math
 import time
+import os
+import json
+import sqlite3
+
+import streamlit.components.v1 as components
+
+import basketball_leaderboard as leaderboard
+import basketball_lut as lut
+import basketball_physics as physics
+import basketball_profiling as profiling
+import basketball_render as render
+import basketball_replay as replay
+import basketball_scheduler as scheduler
+from basketball_state import GameState
+from basketball_physics import LEVEL_CONFIG, GRAVITY, FRICTION
 
 # Page configuration
 st.set_page_config(
@@ -10,265 +25,105 @@ st.set_page_config(
     layout="centered"
 )
 
-# Initialize session state variables
-if 'score' not in st.session_state:
-    st.session_state.score = 0
-if 'level' not in st.session_state:
-    st.session_state.level = 1
-if 'shots_taken' not in st.session_state:
-    st.session_state.shots_taken = 0
-if 'shots_made' not in st.session_state:
-    st.session_state.shots_made = 0
-if 'game_active' not in st.session_state:
-    st.session_state.game_active = True
-if 'drag_start' not in st.session_state:
-    st.session_state.drag_start = None
-if 'drag_end' not in st.session_state:
-    st.session_state.drag_end = None
-if 'ball_pos' not in st.session_state:
-    st.session_state.ball_pos = (150, 400)
-if 'ball_in_motion' not in st.session_state:
-    st.session_state.ball_in_motion = False
-if 'ball_velocity' not in st.session_state:
-    st.session_state.ball_velocity = [0, 0]
-if 'show_trajectory' not in st.session_state:
-    st.session_state.show_trajectory = False
-if 'trajectory_points' not in st.session_state:
-    st.session_state.trajectory_points = []
-if 'last_shot_result' not in st.session_state:
-    st.session_state.last_shot_result = ""
-
-# Game constants
-LEVEL_CONFIG = {
-    1: {"hoop_x": 700, "hoop_y": 200, "hoop_radius": 22, "distance": 550, "par": 5},
-    2: {"hoop_x": 750, "hoop_y": 180, "hoop_radius": 20, "distance": 600, "par": 4},
-    3: {"hoop_x": 800, "hoop_y": 160, "hoop_radius": 18, "distance": 650, "par": 3},
-    4: {"hoop_x": 850, "hoop_y": 150, "hoop_radius": 16, "distance": 700, "par": 3},
-    5: {"hoop_x": 900, "hoop_y": 140, "hoop_radius": 14, "distance": 750, "par": 2}
-}
+# Drag/aim/playback canvas (static frontend, no build step)
+game_canvas = components.declare_component(
+    "basketball_canvas",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "basketball_component")
+)
 
-# Physics constants
-GRAVITY = 0.5
-BOUNCE_DAMPENING = 0.7
-FRICTION = 0.98
-
-# CSS for game styling
-st.markdown("""
-<style>
-    /* Main game container */
-    .game-container {
-        position: relative;
-        width: 100%;
-        height: 500px;
-        background: linear-gradient(180deg, #87CEEB 0%, #98FB98 100%);
-        border-radius: 10px;
-        overflow: hidden;
-        box-shadow: 0 10px 20px rgba(0,0,0,0.2);
-        margin-bottom: 20px;
-        border: 5px solid #8B4513;
-        touch-action: none;
-    }
-    
-    /* Court elements */
-    .court-line {
-        position: absolute;
-        background-color: white;
-        opacity: 0.7;
-    }
-    
-    .hoop {
-        position: absolute;
-        background-color: #FF4500;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.3);
-    }
-    
-    .hoop-inner {
-        position: absolute;
-        background-color: #87CEEB;
-        border-radius: 50%;
-    }
-    
-    .backboard {
-        position: absolute;
-        background-color: #8B4513;
-        border: 2px solid #654321;
-    }
-    
-    .ball {
-        position: absolute;
-        border-radius: 50%;
-        background: radial-gradient(circle at 30% 30%, #FF8C00, #FF4500);
-        box-shadow: inset -5px -5px 10px rgba(0,0,0,0.3), 2px 2px 5px rgba(0,0,0,0.2);
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        color: white;
-        font-weight: bold;
-        font-size: 12px;
-        z-index: 10;
-    }
-    
-    .ball-inner {
-        width: 60%;
-        height: 60%;
-        border-radius: 50%;
-        background: radial-gradient(circle at 30% 30%, #FFD700, transparent);
-        opacity: 0.7;
-    }
-    
-    /* Power indicator */
-    .power-indicator {
-        position: absolute;
-        background: linear-gradient(to right, #00FF00, #FFFF00, #FF0000);
-        height: 10px;
-        border-radius: 5px;
-        transition: width 0.1s;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-    }
-    
-    /* Trajectory line */
-    .trajectory-line {
-        position: absolute;
-        background-color: rgba(255, 255, 255, 0.7);
-        border-radius: 2px;
-        transform-origin: 0 0;
-        z-index: 1;
-    }
-    
-    /* Score and level display */
-    .stats-container {
-        display: flex;
-        justify-content: space-between;
-        background-color: #2E8B57;
-        color: white;
-        padding: 15px;
-        border-radius: 10px;
-        margin-bottom: 15px;
-        box-shadow: 0 5px 10px rgba(0,0,0,0.1);
-        font-family: 'Arial Black', sans-serif;
-    }
-    
-    .stat-box {
-        text-align: center;
-        flex: 1;
-    }
-    
-    .stat-value {
-        font-size: 28px;
-        font-weight: bold;
-        color: #FFD700;
-    }
-    
-    .stat-label {
-        font-size: 14px;
-        opacity: 0.9;
-        margin-top: 5px;
-    }
-    
-    /* Level indicator */
-    .level-indicator {
-        display: flex;
-        justify-content: center;
-        margin-bottom: 15px;
-    }
-    
-    .level-circle {
-        width: 40px;
-        height: 40px;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        margin: 0 5px;
-        font-weight: bold;
-        color: white;
-        box-shadow: 0 3px 6px rgba(0,0,0,0.2);
-    }
-    
-    /* Result message */
-    .result-message {
-        text-align: center;
-        font-size: 24px;
-        font-weight: bold;
-        padding: 10px;
-        border-radius: 5px;
-        margin: 10px 0;
-        animation: fadeIn 0.5s;
-    }
-    
-    @keyframes fadeIn {
-        from { opacity: 0; }
-        to { opacity: 1; }
-    }
-    
-    /* Court markings */
-    .center-circle {
-        position: absolute;
-        border-radius: 50%;
-        border: 3px solid white;
-        opacity: 0.7;
-    }
-    
-    .three-point-line {
-        position: absolute;
-        border-radius: 50%;
-        border: 3px solid white;
-        opacity: 0.7;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Simulate each shot up front and animate it in the browser (False: one rerun per frame)
+CLIENT_PLAYBACK = True
 
-def draw_court():
-    """Draw basketball court elements"""
-    court_html = ""
-    
-    # Center circle
-    court_html += f'<div class="center-circle" style="left: 50px; top: 200px; width: 100px; height: 100px;"></div>'
-    
-    # Three-point line (simplified)
-    court_html += f'<div class="three-point-line" style="left: 450px; top: 50px; width: 200px; height: 300px;"></div>'
-    
-    # Court lines
-    court_html += f'<div class="court-line" style="left: 0; top: 250px; width: 100%; height: 5px;"></div>'
-    court_html += f'<div class="court-line" style="left: 50px; top: 0; width: 5px; height: 100%;"></div>'
-    
-    return court_html
+# How long a made shot stays in the hoop before the ball resets (server-side animation)
+CELEBRATION_SECONDS = 0.5
 
-def draw_hoop(level):
-    """Draw basketball hoop for current level"""
-    config = LEVEL_CONFIG[level]
-    hoop_x, hoop_y = config["hoop_x"], config["hoop_y"]
-    hoop_radius = config["hoop_radius"]
-    
-    hoop_html = ""
-    
-    # Backboard
-    hoop_html += f'<div class="backboard" style="left: {hoop_x - 10}px; top: {hoop_y - 30}px; width: 20px; height: 60px;"></div>'
-    
-    # Hoop outer ring
-    hoop_html += f'<div class="hoop" style="left: {hoop_x - hoop_radius}px; top: {hoop_y - hoop_radius}px; width: {hoop_radius * 2}px; height: {hoop_radius * 2}px;">'
-    hoop_html += f'<div class="hoop-inner" style="width: {hoop_radius * 1.5}px; height: {hoop_radius * 1.5}px;"></div>'
-    hoop_html += '</div>'
-    
-    return hoop_html
+# Every shot is appended here for replay (set BASKETBALL_SHOT_LOG="" to turn it off)
+SHOT_LOG_PATH = os.environ.get("BASKETBALL_SHOT_LOG", replay.DEFAULT_PATH)
+
+# SQLite file holding every submitted score
+LEADERBOARD_PATH = os.environ.get("BASKETBALL_LEADERBOARD", leaderboard.DEFAULT_PATH)
+
+@st.cache_resource
+def rerun_stats():
+    """Process-wide rerun phase timings (only filled when BASKETBALL_PROFILE is set)"""
+    return profiling.RerunStats()
+
+@st.cache_resource
+def scoring_tables():
+    """Per-level scoring tables, loaded in the background once per process (and cached on disk)"""
+    return lut.TableLoader()
+
+def start_timer(kind):
+    """Begin timing a rerun, dropping the sampled profile of one that st.rerun cut short"""
+    previous = st.session_state.get("rerun_timer")
+    if previous is not None:
+        previous.abandon()
+    st.session_state.rerun_timer = profiling.RerunTimer(rerun_stats(), kind)
+    return st.session_state.rerun_timer
+
+# Per-phase timing of this rerun (a no-op unless profiling is enabled)
+timer = start_timer("full")
+
+# Initialize the session's game state
+if 'game' not in st.session_state:
+    st.session_state.game = GameState(client_playback=CLIENT_PLAYBACK)
+    st.session_state.session_tag = random.getrandbits(32)
+game = st.session_state.game
+
+# Start loading the aim-assist tables with the process, long before anyone can miss
+scoring_tables()
+
+# HTML and component bytes pushed to the browser by the current rerun
+st.session_state.payload_bytes = 0
+st.session_state.full_rerun = True
+timer.lap("session init")
+
+def stats_snapshot():
+    """Everything the page shows outside the game canvas"""
+    return (
+        game.score,
+        game.level,
+        game.shots_made,
+        game.shots_taken,
+        game.last_shot_result
+    )
+
+def markdown_html(html):
+    """st.markdown for raw HTML, counted in the rerun's payload"""
+    st.session_state.payload_bytes += len(html.encode())
+    st.markdown(html, unsafe_allow_html=True)
+
+# Physics the canvas needs to preview a shot without asking the server
+PREVIEW_PHYSICS = {
+    "gravity": GRAVITY,
+    "friction": FRICTION,
+    "bounce": physics.BOUNCE_DAMPENING,
+    "floorY": physics.FLOOR_Y,
+    "wallRight": physics.WALL_RIGHT,
+    "powerDistance": physics.POWER_DISTANCE,
+    "maxPower": physics.MAX_POWER,
+    "speedScale": physics.SPEED_SCALE,
+    "ballRadius": physics.BALL_RADIUS,
+    "restSpeed": physics.REST_SPEED,
+    "previewSteps": render.TRAJECTORY_STEPS,
+    "frameMs": physics.FRAME_SECONDS * 1000
+}
+
+# Page CSS (the canvas draws and styles itself)
+markdown_html(render.PAGE_CSS)
+timer.lap("css")
 
 def draw_ball():
-    """Draw basketball at current position"""
-    ball_x, ball_y = st.session_state.ball_pos
-    ball_html = f'<div class="ball" id="basketball" style="left: {ball_x}px; top: {ball_y}px; width: 40px; height: 40px;">'
-    ball_html += '<div class="ball-inner"></div>'
-    ball_html += '</div>'
-    return ball_html
+    """Ball position for the canvas"""
+    ball_x, ball_y = game.ball_pos
+    return [round(ball_x, 1), round(ball_y, 1)]
 
 def draw_power_indicator():
-    """Draw power indicator based on drag distance"""
-    if st.session_state.drag_start and st.session_state.drag_end:
-        start_x, start_y = st.session_state.drag_start
-        end_x, end_y = st.session_state.drag_end
+    """Power bar for the canvas while aiming: [x, y, fill] at the drag start, or None"""
+    # The drag outlives the shot (record_miss reads it), so the aim flag decides, as for the preview
+    if game.show_trajectory and game.drag_start and game.drag_end:
+        start_x, start_y = game.drag_start
+        end_x, end_y = game.drag_end
         
         # Calculate power (distance dragged)
         drag_distance = math.sqrt((end_x - start_x)**2 + (end_y - start_y)**2)
@@ -276,321 +131,335 @@ def draw_power_indicator():
         power = min(drag_distance / max_distance, 1.0)
         
         # Draw power indicator at drag start position
-        indicator_html = f'<div class="power-indicator" style="left: {start_x}px; top: {start_y + 25}px; width: {power * 100}px;"></div>'
-        return indicator_html
-    return ""
+        return [start_x, start_y + 25, round(power, 3)]
+    return None
 
 def draw_trajectory():
-    """Draw trajectory line based on drag vector"""
-    if st.session_state.show_trajectory and st.session_state.drag_start and st.session_state.drag_end:
-        start_x, start_y = st.session_state.drag_start
-        end_x, end_y = st.session_state.drag_end
+    """Aim preview for the canvas as flat [x0, y0, x1, y1, ...] points"""
+    # Only scripted sessions (bench, load test) set show_trajectory; a player's drag
+    # is previewed by the component itself, in previewPoints()
+    if game.show_trajectory and game.drag_start and game.drag_end:
+        start_x, start_y = game.drag_start
+        end_x, end_y = game.drag_end
         
-        # Calculate angle and power
-        dx = end_x - start_x
-        dy = end_y - start_y
-        angle = math.atan2(dy, dx)
-        distance = math.sqrt(dx**2 + dy**2)
-        power = min(distance / 150, 1.5)
-        
-        # Generate trajectory points
-        points = []
-        vx = math.cos(angle) * power * 15
-        vy = math.sin(angle) * power * 15
-        px, py = start_x + 20, start_y + 20  # Start from ball center
-        
-        for i in range(20):
-            points.append((px, py))
-            px += vx
-            py += vy
-            vy += GRAVITY
-            vx *= FRICTION
-        
-        # Draw trajectory line
-        trajectory_html = ""
-        for i in range(len(points) - 1):
-            x1, y1 = points[i]
-            x2, y2 = points[i + 1]
-            
-            # Calculate line length and angle
-            line_length = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            line_angle = math.atan2(y2 - y1, x2 - x1) * 180 / math.pi
-            
-            # Draw line segment with decreasing opacity
-            opacity = 0.7 * (1 - i/20)
-            trajectory_html += f'<div class="trajectory-line" style="left: {x1}px; top: {y1}px; width: {line_length}px; height: 2px; transform: rotate({line_angle}deg); opacity: {opacity};"></div>'
-        
-        return trajectory_html
-    return ""
+        # Quantize the drag so repeated aiming over the same spot hits the preview cache
+        q = render.PREVIEW_QUANTUM
+        dx = round((end_x - start_x) / q) * q
+        dy = round((end_y - start_y) / q) * q
+        return render.trajectory_points(game.level, tuple(game.ball_pos), dx, dy)
+    return ()
+
+def reset_ball():
+    """Put the ball back at the shooting spot"""
+    game.ball_in_motion = False
+    game.ball_slot = None
+    game.ball_pos = physics.BALL_START
+    game.ball_velocity = (0.0, 0.0)
+
+@st.cache_resource
+def leaderboard_store():
+    """Process-wide leaderboard with its background writer, or None if the database can't be opened"""
+    try:
+        return leaderboard.Leaderboard(LEADERBOARD_PATH)
+    except sqlite3.Error:
+        # Unwritable or corrupt database file: the game goes on without scores
+        return None
+
+def submit_score():
+    """Queue the current score under the player's name (once per score)"""
+    player = st.session_state.get("player_name", "").strip()
+    board = leaderboard_store()
+    if board and player and game.score and st.session_state.get("submitted_score") != game.score:
+        board.submit(player, game.score, game.level, game.shots_taken)
+        st.session_state.submitted_score = game.score
+
+def score_shot():
+    """Award points for a made shot and handle level progression"""
+    game.score += (10 * game.level)
+    game.shots_made += 1
+    game.last_shot_result = "SCORE! +" + str(10 * game.level) + " points"
+    
+    # Check if player should advance to next level
+    if game.shots_made >= LEVEL_CONFIG[game.level]["par"]:
+        if game.level < 5:
+            game.level += 1
+            game.shots_made = 0
+            game.shots_taken = 0
+            game.last_shot_result = f"LEVEL UP! Now at Level {game.level}"
+        else:
+            game.last_shot_result = "CHAMPION! You've completed all levels!"
+            submit_score()
+
+@st.cache_resource
+def tick_scheduler():
+    """Process-wide scheduler that steps every session's ball in one batch per tick"""
+    return scheduler.TickScheduler()
+
+@st.cache_resource
+def load_controller():
+    """Process-wide controller that slows or sheds server-side animation under load"""
+    return scheduler.LoadController()
+
+@st.cache_resource
+def shot_log():
+    """Process-wide append-only shot log"""
+    return replay.ShotLog(SHOT_LOG_PATH)
+
+def log_shot(dx, dy, shot):
+    """Record the shot's inputs and outcome so it can be replayed later"""
+    if SHOT_LOG_PATH:
+        try:
+            shot_log().append(st.session_state.session_tag, game.level, game.ball_pos, dx, dy, shot)
+        except OSError:
+            # Logging is best effort: a full disk or unwritable log directory must not stop the shot
+            pass
+
+def record_miss():
+    """Show an aim-assist hint after a missed shot"""
+    table = scoring_tables().get(game.level)
+    if table is None:
+        # Still loading: no hint rather than a rerun that waits for the build
+        return
+    start_x, start_y = game.drag_start
+    end_x, end_y = game.drag_end
+    game.last_shot_result = lut.aim_hint(table, end_x - start_x, end_y - start_y)
 
 def update_ball_position():
     """Update ball position based on velocity and physics"""
-    if st.session_state.ball_in_motion:
-        x, y = st.session_state.ball_pos
-        vx, vy = st.session_state.ball_velocity
-        
-        # Apply gravity
-        vy += GRAVITY
-        
-        # Apply friction
-        vx *= FRICTION
-        vy *= FRICTION
+    if game.ball_in_motion:
+        # Celebrating a score: hold the ball until the deadline, then reset it
+        if game.celebrate_until is not None:
+            if time.monotonic() >= game.celebrate_until:
+                game.celebrate_until = None
+                reset_ball()
+            return
         
-        # Update position
-        x += vx
-        y += vy
+        # The shared scheduler steps every session's ball; read back ours
+        polled = tick_scheduler().poll(game.ball_slot) if game.ball_slot else None
+        if polled is None:
+            reset_ball()
+            return
+        x, y, event = polled
         
-        # Boundary collision (floor)
-        if y >= 460:  # Ball hits ground
-            y = 460
-            vy = -vy * BOUNCE_DAMPENING
-            vx *= FRICTION * 0.9
-            
-            # If ball has almost stopped, reset it
-            if abs(vx) < 0.5 and abs(vy) < 0.5:
-                st.session_state.ball_in_motion = False
-                st.session_state.ball_pos = (150, 400)
-                st.session_state.ball_velocity = [0, 0]
-        
-        # Boundary collision (walls)
-        if x <= 0 or x >= 960:
-            vx = -vx * BOUNCE_DAMPENING
-        
-        # Check if ball goes through hoop
-        config = LEVEL_CONFIG[st.session_state.level]
-        hoop_x, hoop_y = config["hoop_x"], config["hoop_y"]
-        hoop_radius = config["hoop_radius"]
-        
-        ball_center_x = x + 20
-        ball_center_y = y + 20
-        
-        # Calculate distance from ball center to hoop center
-        distance = math.sqrt((ball_center_x - hoop_x)**2 + (ball_center_y - hoop_y)**2)
+        if event == physics.RESTED:
+            tick_scheduler().release(game.ball_slot)
+            record_miss()
+            reset_ball()
+            return
         
         # If ball passes through hoop
-        if distance < hoop_radius and vy > 0:  # Ball is falling through hoop
-            if not hasattr(st.session_state, 'score_added'):
-                st.session_state.score_added = True
-                st.session_state.score += (10 * st.session_state.level)
-                st.session_state.shots_made += 1
-                st.session_state.last_shot_result = "SCORE! +" + str(10 * st.session_state.level) + " points"
-                
-                # Check if player should advance to next level
-                if st.session_state.shots_made >= LEVEL_CONFIG[st.session_state.level]["par"]:
-                    if st.session_state.level < 5:
-                        st.session_state.level += 1
-                        st.session_state.shots_made = 0
-                        st.session_state.shots_taken = 0
-                        st.session_state.last_shot_result = f"LEVEL UP! Now at Level {st.session_state.level}"
-                    else:
-                        st.session_state.last_shot_result = "CHAMPION! You've completed all levels!"
-                
-                # Reset ball after a short delay
-                time.sleep(0.5)
-                st.session_state.ball_in_motion = False
-                st.session_state.ball_pos = (150, 400)
-                st.session_state.ball_velocity = [0, 0]
-                del st.session_state.score_added
-                st.rerun()
+        if event == physics.SCORED:
+            tick_scheduler().release(game.ball_slot)
+            score_shot()
+            
+            # Reset ball after a short delay, measured against a deadline so no thread sleeps
+            game.celebrate_until = time.monotonic() + CELEBRATION_SECONDS
+            game.ball_pos = (x, y)
+            return
         
-        # Update ball position and velocity
-        st.session_state.ball_pos = (x, y)
-        st.session_state.ball_velocity = [vx, vy]
+        # Update ball position
+        game.ball_pos = (x, y)
 
 def shoot_ball():
     """Initiate ball shot based on drag vector"""
-    if st.session_state.drag_start and st.session_state.drag_end:
-        start_x, start_y = st.session_state.drag_start
-        end_x, end_y = st.session_state.drag_end
-        
-        # Calculate angle and power
-        dx = end_x - start_x
-        dy = end_y - start_y
-        angle = math.atan2(dy, dx)
-        distance = math.sqrt(dx**2 + dy**2)
-        power = min(distance / 150, 1.5)
+    if game.drag_start and game.drag_end:
+        start_x, start_y = game.drag_start
+        end_x, end_y = game.drag_end
         
         # Set initial velocity
-        st.session_state.ball_velocity = [
-            math.cos(angle) * power * 15,
-            math.sin(angle) * power * 15
-        ]
+        dx, dy = end_x - start_x, end_y - start_y
+        game.ball_velocity = physics.launch_velocity(dx, dy)
+        game.shots_taken += 1
+        game.show_trajectory = False
+        game.last_shot_result = ""
         
-        # Set ball in motion
-        st.session_state.ball_in_motion = True
-        st.session_state.shots_taken += 1
-        st.session_state.show_trajectory = False
-        st.session_state.last_shot_result = ""
+        # Saturated process: this shot plays back in the browser instead of rerunning per frame
+        server_side = not game.client_playback and load_controller().admit(tick_scheduler().active_count)
+        
+        if not server_side:
+            # Simulate the whole flight now and let the browser animate it
+            level = game.level
+            ball = physics.Ball(*game.ball_pos, *game.ball_velocity)
+            shot = physics.simulate(ball, physics.hoop_for(level))
+            log_shot(dx, dy, shot)
+            game.playback = {"id": time.time(), "level": level, "shot": shot}
+            if shot.event == physics.SCORED:
+                score_shot()
+            else:
+                record_miss()
+            reset_ball()
+        else:
+            # Set ball in motion on the shared tick scheduler
+            ball = physics.Ball(*game.ball_pos, *game.ball_velocity)
+            game.ball_slot = tick_scheduler().launch(ball, physics.hoop_for(game.level))
+            game.ball_in_motion = True
+            
+            # The log keeps the scalar engine's outcome; simulating it costs well under a frame
+            if SHOT_LOG_PATH:
+                log_shot(dx, dy, physics.simulate(ball, physics.hoop_for(game.level)))
+
+def canvas_delta(state):
+    """The parts of the canvas state the component does not have yet, tagged with a revision"""
+    shown = game.canvas_shown
+    if shown is None:
+        delta = dict(state, full=True)
+    else:
+        delta = {key: value for key, value in state.items() if shown.get(key) != value}
+    game.canvas_shown = state
+    game.canvas_rev += 1
+    delta["rev"] = game.canvas_rev
+    return delta
+
+def on_drag_release():
+    """Shoot with the drag vector the canvas component reported on release"""
+    drag = st.session_state.game_canvas
+    if drag and "resync" in drag:
+        # The component missed a delta (e.g. it was remounted): send it everything again
+        game.canvas_shown = None
+    elif drag:
+        game.drag_start = tuple(drag["start"])
+        game.drag_end = tuple(drag["end"])
+        shoot_ball()
+
+# Handle shoot requests set directly in session state (scripted sessions)
+timer.lap("definitions")
+if 'shoot' in st.session_state and st.session_state.shoot:
+    shoot_ball()
+    st.session_state.shoot = False
+    timer.lap("shoot_ball")
 
 # Game UI
 st.title("🏀 Basketball Challenge")
 
 # Display stats
-st.markdown(f"""
+markdown_html(f"""
 <div class="stats-container">
     <div class="stat-box">
-        <div class="stat-value">{st.session_state.score}</div>
+        <div class="stat-value">{game.score}</div>
         <div class="stat-label">SCORE</div>
     </div>
     <div class="stat-box">
-        <div class="stat-value">{st.session_state.level}</div>
+        <div class="stat-value">{game.level}</div>
         <div class="stat-label">LEVEL</div>
     </div>
     <div class="stat-box">
-        <div class="stat-value">{st.session_state.shots_made}/{LEVEL_CONFIG[st.session_state.level]["par"]}</div>
+        <div class="stat-value">{game.shots_made}/{LEVEL_CONFIG[game.level]["par"]}</div>
         <div class="stat-label">SHOTS MADE / PAR</div>
     </div>
     <div class="stat-box">
-        <div class="stat-value">{st.session_state.shots_taken}</div>
+        <div class="stat-value">{game.shots_taken}</div>
         <div class="stat-label">SHOTS TAKEN</div>
     </div>
 </div>
-""", unsafe_allow_html=True)
+""")
 
 # Display level indicators
-level_html = '<div class="level-indicator">'
-for i in range(1, 6):
-    if i == st.session_state.level:
-        bg_color = "#FF4500"
-    elif i < st.session_state.level:
-        bg_color = "#32CD32"
-    else:
-        bg_color = "#C0C0C0"
-    
-    level_html += f'<div class="level-circle" style="background-color: {bg_color};">{i}</div>'
-level_html += '</div>'
-st.markdown(level_html, unsafe_allow_html=True)
+markdown_html(render.draw_level_indicator(game.level))
 
 # Display last shot result
-if st.session_state.last_shot_result:
-    result_color = "#32CD32" if "SCORE" in st.session_state.last_shot_result or "LEVEL" in st.session_state.last_shot_result else "#FF4500"
-    st.markdown(f'<div class="result-message" style="color: {result_color}">{st.session_state.last_shot_result}</div>', unsafe_allow_html=True)
-
-# Game canvas
-game_html = f'<div class="game-container" id="game-container">'
-game_html += draw_court()
-game_html += draw_hoop(st.session_state.level)
-game_html += draw_trajectory()
-game_html += draw_ball()
-game_html += draw_power_indicator()
-game_html += '</div>'
-
-st.markdown(game_html, unsafe_allow_html=True)
-
-# JavaScript for mouse/touch drag interactions
-st.components.v1.html(f"""
-<script>
-const container = document.getElementById('game-container');
-const ball = document.getElementById('basketball');
-let isDragging = false;
-let startX, startY;
-
-// Mouse events
-container.addEventListener('mousedown', startDrag);
-container.addEventListener('mousemove', drag);
-container.addEventListener('mouseup', endDrag);
-container.addEventListener('mouseleave', endDrag);
-
-// Touch events for mobile
-container.addEventListener('touchstart', function(e) {{
-    e.preventDefault();
-    const touch = e.touches[0];
-    startDrag({{
-        clientX: touch.clientX,
-        clientY: touch.clientY,
-        preventDefault: () => {{}}
-    }});
-}});
-
-container.addEventListener('touchmove', function(e) {{
-    e.preventDefault();
-    if (isDragging && e.touches.length > 0) {{
-        const touch = e.touches[0];
-        drag({{
-            clientX: touch.clientX,
-            clientY: touch.clientY,
-            preventDefault: () => {{}}
-        }});
-    }}
-}});
-
-container.addEventListener('touchend', endDrag);
-
-function startDrag(e) {{
-    e.preventDefault();
-    const rect = container.getBoundingClientRect();
+if game.last_shot_result:
+    result_color = "#32CD32" if "SCORE" in game.last_shot_result or "LEVEL" in game.last_shot_result else "#FF4500"
+    markdown_html(f'<div class="result-message" style="color: {result_color}">{game.last_shot_result}</div>')
+st.session_state.stats_shown = stats_snapshot()
+timer.lap("stats")
+
+# The timer interval only reaches the browser on a full rerun, so remember which one it got
+st.session_state.fragment_period = load_controller().period if game.ball_in_motion else None
+
+@st.fragment(run_every=st.session_state.fragment_period)
+def game_canvas_fragment():
+    """Game canvas and physics tick; reruns on its own timer while the ball moves"""
+    started = time.perf_counter()
+    if st.session_state.full_rerun:
+        timer = st.session_state.rerun_timer
+    else:
+        st.session_state.payload_bytes = 0
+        timer = start_timer("fragment")
     
-    // Only allow drag if ball is not in motion
-    if (!{str(st.session_state.ball_in_motion).lower()}) {{
-        isDragging = true;
-        startX = e.clientX - rect.left;
-        startY = e.clientY - rect.top;
-        
-        // Send drag start to Streamlit
-        window.parent.postMessage({{
-            type: 'streamlit:setComponentValue',
-            value: {{
-                drag_start: [startX, startY],
-                show_trajectory: true
-            }}
-        }}, '*');
-    }}
-}}
-
-function drag(e) {{
-    e.preventDefault();
-    if (isDragging) {{
-        const rect = container.getBoundingClientRect();
-        const currentX = e.clientX - rect.left;
-        const currentY = e.clientY - rect.top;
+    # Advance the ball one frame per run
+    if game.ball_in_motion:
+        with timer.phase("update_ball_position"):
+            update_ball_position()
         
-        // Send drag update to Streamlit
-        window.parent.postMessage({{
-            type: 'streamlit:setComponentValue',
-            value: {{
-                drag_end: [currentX, currentY]
-            }}
-        }}, '*');
-    }}
-}}
-
-function endDrag(e) {{
-    e.preventDefault();
-    if (isDragging) {{
-        isDragging = false;
-        const rect = container.getBoundingClientRect();
-        const endX = e.clientX ? e.clientX - rect.left : startX;
-        const endY = e.clientY ? e.clientY - rect.top : startY;
-        
-        // Send shoot command to Streamlit
-        window.parent.postMessage({{
-            type: 'streamlit:setComponentValue',
-            value: {{
-                shoot: true,
-                drag_end: [endX, endY]
-            }}
-        }}, '*');
-    }}
-}}
-</script>
-""", height=0)
-
-# Handle drag and shoot events from JavaScript
-# Since we can't directly capture JavaScript events in Streamlit, we'll use a workaround
-# with a button that gets triggered by JavaScript
-if 'shoot' in st.session_state and st.session_state.shoot:
-    shoot_ball()
-    st.session_state.shoot = False
+        # Ball stopped, or the load controller changed the frame period: a full rerun
+        # turns the fragment timer off or re-registers it at the new period
+        if not game.ball_in_motion or load_controller().period != st.session_state.fragment_period:
+            st.rerun()
+    
+    # Something outside the canvas changed (e.g. a drag released in here): redraw everything
+    if stats_snapshot() != st.session_state.stats_shown:
+        st.rerun()
+    
+    playback = game.playback
+    level = playback["level"] if playback else game.level
+    with timer.phase("draw_trajectory"):
+        trajectory = draw_trajectory()
+    with timer.phase("draw_ball"):
+        ball = draw_ball()
+    with timer.phase("draw_power_indicator"):
+        power = draw_power_indicator()
+    
+    # The whole scene as numbers; the component keeps it mounted and only gets what changed
+    canvas_state = {
+        "hoop": physics.hoop_for(level),
+        "ball": ball,
+        "trajectory": trajectory,
+        "power": power,
+        "physics": PREVIEW_PHYSICS,
+        "playback": {"id": playback["id"], "frames": playback["shot"].frames, "scoredAt": playback["shot"].scored_at} if playback else None,
+        "ballInMotion": game.ball_in_motion,
+        "height": 530
+    }
+    with timer.phase("component"):
+        canvas_args = canvas_delta(canvas_state)
+        st.session_state.payload_bytes += len(json.dumps(canvas_args))
+        game_canvas(**canvas_args, key="game_canvas", on_change=on_drag_release, default=None)
+    game.playback = None
+    
+    # Feed animation rerun cost back into the load controller
+    if game.ball_in_motion:
+        controller = load_controller()
+        controller.record(time.perf_counter() - started)
+        controller.update(tick_scheduler().active_count)
+    
+    if not st.session_state.full_rerun:
+        timer.finish(st.session_state.payload_bytes)
 
-# Update ball position continuously when in motion
-if st.session_state.ball_in_motion:
-    update_ball_position()
-    time.sleep(0.03)  # Control game speed
-    st.rerun()
+# Game canvas: the component previews the aim locally and reports only the final drag;
+# while the ball moves each frame only sends its new position (a few dozen bytes)
+game_canvas_fragment()
 
-# Add a hidden button to trigger reruns from JavaScript
-if st.button("Update Game State", key="hidden_button", help="", type="primary", use_container_width=True):
-    st.rerun()
+# Leaderboard: scores are written in batches in the background, reads are cached briefly
+with st.expander("🏆 Leaderboard"):
+    board = leaderboard_store()
+    try:
+        player = st.session_state.get("player_name", "").strip()
+        best = board.personal_best(player) if board and player else None
+        top = board.top(10) if board else None
+    except sqlite3.Error:
+        board = None
+    
+    if board is None:
+        st.caption("Leaderboard unavailable")
+    else:
+        st.text_input("Your name", key="player_name", max_chars=24)
+        submitted = st.session_state.get("submitted_score") == game.score
+        st.button("Submit score", on_click=submit_score, disabled=not game.score or submitted)
+        if best is not None:
+            st.caption(f"Your best: {best}")
+        if top:
+            st.table([{"Player": name, "Score": score, "Level": level} for name, score, level in top])
+        else:
+            st.caption("No scores yet")
 
 # Add some game info at the bottom
 st.caption("💡 Drag from the ball to aim and shoot. Make par to advance to the next level!")
+
+# Rerun timings across all sessions (BASKETBALL_PROFILE=1)
+if profiling.ENABLED:
+    with st.expander("Rerun timings"):
+        st.caption(f"{rerun_stats().reruns} reruns, times in ms")
+        st.dataframe(rerun_stats().report(), hide_index=True)
+
+timer.finish(st.session_state.payload_bytes)
+st.session_state.full_rerun = False
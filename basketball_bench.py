@@ -0,0 +1,252 @@
+"""Headless benchmarks for the basketball game.
+
+Measures the physics engine directly and the app through Streamlit's
+AppTest harness (no browser), then saves the numbers as JSON so runs can be
+compared over time:
+
+    python basketball_bench.py                      # writes bench-<time>.json
+    python basketball_bench.py --compare old.json   # also prints the change
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import basketball_lut as lut
+import basketball_physics as physics
+import basketball_trajectory as trajectory
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "1234.py")
+
+# A spread of drags covering weak to full-power shots at every useful angle
+DRAG_GRID = [(dx, dy) for dx in range(20, 230, 30) for dy in range(-240, 60, 30)]
+
+
+def percentiles(samples):
+    """p50/p99/mean of a list of seconds, in ms"""
+    values = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "runs": len(samples)
+    }
+
+
+def bench_steps(seconds=1.0):
+    """Scalar `physics.step()` calls per second on a long in-flight shot"""
+    hoop = physics.hoop_for(1)
+    launch = physics.Ball(*physics.BALL_START, *physics.launch_velocity(100, -200))
+    ball = launch
+    steps = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(1000):
+            ball, event = physics.step(ball, hoop)
+            if event != physics.IN_FLIGHT:
+                ball = launch
+        steps += 1000
+    return steps / seconds
+
+
+def bench_batch_steps(balls=1000, steps=200):
+    """Ball-steps per second through the vectorized `step_arrays`"""
+    hoop = physics.hoop_for(1)
+    vx, vy = trajectory.launch_velocities(np.tile(DRAG_GRID, (balls // len(DRAG_GRID) + 1, 1))[:balls])
+    x = np.full(balls, float(physics.BALL_START[0]))
+    y = np.full(balls, float(physics.BALL_START[1]))
+    started = time.perf_counter()
+    for _ in range(steps):
+        x, y, vx, vy, _, _ = trajectory.step_arrays(x, y, vx, vy, hoop.x, hoop.y, hoop.radius)
+    return balls * steps / (time.perf_counter() - started)
+
+
+def bench_shots(seconds=1.0):
+    """Whole shots per second through `physics.simulate()`"""
+    hoop = physics.hoop_for(1)
+    shots = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        dx, dy = DRAG_GRID[shots % len(DRAG_GRID)]
+        physics.simulate(physics.Ball(*physics.BALL_START, *physics.launch_velocity(dx, dy)), hoop)
+        shots += 1
+    return shots / seconds
+
+
+def bench_batch_shots(repeats=20):
+    """Whole shots per second through the vectorized `shots_score`"""
+    drags = np.tile(DRAG_GRID, (repeats, 1))
+    started = time.perf_counter()
+    trajectory.shots_score(drags, 1)
+    return len(drags) / (time.perf_counter() - started)
+
+
+def _player(timeout):
+    """A fresh scripted session of the game, run once
+
+    It is the load test's player, so the runs reuse one compiled script as the
+    server does and animation frames can rerun just the canvas fragment.
+    """
+    from basketball_loadtest import Player, install_metered_runner
+
+    install_metered_runner()
+    return Player(0, client_playback=True, timeout=timeout)
+
+
+def _timed_run(player, samples, payload, fragment_id=None):
+    started = time.perf_counter()
+    player.run(fragment_id)
+    samples.append(time.perf_counter() - started)
+    payload.append(player.at.session_state.payload_bytes)
+    if player.at.exception:
+        raise RuntimeError(f"App raised: {player.at.exception[0].message}")
+
+
+def bench_reruns(reruns=100, timeout=60):
+    """Rerun latency and payload bytes for the idle, aiming and animating states"""
+    # Warm up the caches (scoring tables on disk, rendered fragments) outside the timings
+    lut.load_all()
+    player = _player(timeout)
+    at = player.at
+    game = at.session_state.game
+    results = {}
+    game.drag_start, game.drag_end = physics.BALL_START, (250, 300)
+    at.session_state.shoot = True
+    player.run()
+
+    # Idle: nothing changes between reruns
+    samples, payload = [], []
+    for _ in range(reruns):
+        _timed_run(player, samples, payload)
+    results["idle"] = {**percentiles(samples), "bytes_per_rerun": int(np.mean(payload))}
+
+    # Aiming: the trajectory preview follows a moving drag
+    samples, payload = [], []
+    game.show_trajectory = True
+    for i in range(reruns):
+        dx, dy = DRAG_GRID[i % len(DRAG_GRID)]
+        game.drag_start = physics.BALL_START
+        game.drag_end = (physics.BALL_START[0] + dx, physics.BALL_START[1] + dy)
+        _timed_run(player, samples, payload)
+    game.show_trajectory = False
+    results["aiming"] = {**percentiles(samples), "bytes_per_rerun": int(np.mean(payload))}
+
+    # Animating: server-side playback, where each frame is a fragment-only rerun fired by the
+    # timer the app registered; reshoot whenever the ball stops
+    samples, payload = [], []
+    game.client_playback = False
+    while len(samples) < reruns:
+        if not (game.ball_in_motion and player.fragment_timer):
+            dx, dy = DRAG_GRID[len(samples) % len(DRAG_GRID)]
+            game.drag_start = physics.BALL_START
+            game.drag_end = (physics.BALL_START[0] + dx, physics.BALL_START[1] + dy)
+            at.session_state.shoot = True
+            player.run()
+            continue
+        fragment_id, interval = player.fragment_timer
+        time.sleep(interval)
+        _timed_run(player, samples, payload, fragment_id)
+    results["animating"] = {**percentiles(samples), "bytes_per_rerun": int(np.mean(payload))}
+
+    # Shooting: one rerun that simulates the shot and ships the client-side playback
+    samples, payload = [], []
+    game.client_playback = True
+    for i in range(reruns):
+        dx, dy = DRAG_GRID[i % len(DRAG_GRID)]
+        game.drag_start = physics.BALL_START
+        game.drag_end = (physics.BALL_START[0] + dx, physics.BALL_START[1] + dy)
+        at.session_state.shoot = True
+        _timed_run(player, samples, payload)
+    results["shooting"] = {**percentiles(samples), "bytes_per_rerun": int(np.mean(payload))}
+    return results
+
+
+def environment():
+    """What the numbers were measured on"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(APP_PATH),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        import streamlit
+        streamlit_version = streamlit.__version__
+    except ImportError:
+        streamlit_version = None
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "engine_version": physics.ENGINE_VERSION,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "streamlit": streamlit_version,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count()
+    }
+
+
+def run(reruns=100, skip_app=False):
+    """Run every benchmark and return the results dict"""
+    results = {
+        "environment": environment(),
+        "physics": {
+            "steps_per_sec": round(bench_steps()),
+            "batch_ball_steps_per_sec": round(bench_batch_steps()),
+            "shots_per_sec": round(bench_shots(), 1),
+            "batch_shots_per_sec": round(bench_batch_shots(), 1)
+        }
+    }
+    if not skip_app:
+        results["reruns"] = bench_reruns(reruns)
+    return results
+
+
+def _flatten(results, prefix=""):
+    """{"physics.steps_per_sec": value, ...} for the numeric leaves"""
+    flat = {}
+    for key, value in results.items():
+        if key == "environment":
+            continue
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(old, new):
+    """Lines showing how each metric moved between two result files"""
+    before, after = _flatten(old), _flatten(new)
+    lines = []
+    for key, value in after.items():
+        if key in before and before[key]:
+            change = (value - before[key]) / before[key] * 100
+            lines.append(f"{key:45} {before[key]:>14} -> {value:>14} ({change:+.1f}%)")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=100, help="reruns timed per app state")
+    parser.add_argument("--skip-app", action="store_true", help="only benchmark the physics")
+    parser.add_argument("--output", help="JSON file to write (default bench-<time>.json)")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    results = run(args.reruns, args.skip_app)
+    output = args.output or f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(json.dumps({key: value for key, value in results.items() if key != "environment"}, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            print("\n".join(compare(json.load(f), results)))
+    print(f"Saved {output}", file=sys.stderr)
@@ -0,0 +1,133 @@
+"""Persistent leaderboard for the basketball game.
+
+Scores live in a local SQLite database in WAL mode, so readers never wait
+for the writer. Sessions only queue their scores; one background thread
+writes whatever has queued up in a single transaction, so many players
+finishing at once cost one commit instead of one each. Top-N and personal
+best reads walk an index and are cached for a few seconds, and the cache
+is dropped after every write batch.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".leaderboard.db")
+
+# Writer: commit at most this many scores per transaction, waiting this long for more to queue
+BATCH_SIZE = 256
+BATCH_WAIT = 0.05
+
+# Seconds a top-N or personal-best answer is served from memory
+CACHE_TTL = 2.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    shots_taken INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC);
+CREATE INDEX IF NOT EXISTS scores_by_level ON scores (level, score DESC);
+CREATE INDEX IF NOT EXISTS scores_by_player ON scores (player, score DESC);
+"""
+
+
+class Leaderboard:
+    """Batched writer plus TTL-cached readers over one SQLite file"""
+
+    def __init__(self, path=DEFAULT_PATH, cache_ttl=CACHE_TTL):
+        self.path = path
+        self.cache_ttl = cache_ttl
+        self._queue = queue.Queue()
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+
+        db = self._connect()
+        try:
+            db.executescript(_SCHEMA)
+        finally:
+            db.close()
+        self._writer = threading.Thread(target=self._write_loop, name="leaderboard-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _reader(self):
+        """This thread's read connection"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._connect()
+        return db
+
+    def submit(self, player, score, level, shots_taken):
+        """Queue a finished game's score; it is written with the next batch"""
+        self._queue.put((player, int(score), int(level), int(shots_taken), time.time()))
+
+    def flush(self):
+        """Block until every queued score is committed"""
+        self._queue.join()
+
+    def _write_loop(self):
+        db = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + BATCH_WAIT
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            try:
+                with db:
+                    db.executemany(
+                        "INSERT INTO scores (player, score, level, shots_taken, created) VALUES (?, ?, ?, ?, ?)",
+                        batch
+                    )
+            except sqlite3.Error:
+                # Losing a batch of scores must not kill the writer for everyone else
+                pass
+            with self._cache_lock:
+                self._cache.clear()
+            for _ in batch:
+                self._queue.task_done()
+
+    def _cached(self, key, query, params):
+        now = time.monotonic()
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] > now:
+                return hit[1]
+        rows = self._reader().execute(query, params).fetchall()
+        with self._cache_lock:
+            self._cache[key] = (now + self.cache_ttl, rows)
+        return rows
+
+    def top(self, n=10, level=None):
+        """Best n scores as (player, score, level) rows, overall or for games that ended on a level"""
+        if level is None:
+            return self._cached(
+                ("top", n, None),
+                "SELECT player, score, level FROM scores ORDER BY score DESC LIMIT ?", (n,)
+            )
+        return self._cached(
+            ("top", n, level),
+            "SELECT player, score, level FROM scores WHERE level = ? ORDER BY score DESC LIMIT ?", (level, n)
+        )
+
+    def personal_best(self, player):
+        """A player's best score, or None if they have none"""
+        rows = self._cached(
+            ("best", player),
+            "SELECT score FROM scores WHERE player = ? ORDER BY score DESC LIMIT 1", (player,)
+        )
+        return rows[0][0] if rows else None
@@ -0,0 +1,268 @@
+"""Multi-session load test for the basketball game.
+
+Ramps up the number of concurrent players, each an AppTest session of
+1234.py in its own thread playing a scripted aim / shoot / watch loop at the
+game's frame rate, all sharing one process like sessions on one server.
+For every concurrency level it reports per-session CPU time, tracemalloc
+footprint, bytes sent to the browser and tail rerun latency, then names the
+knee (the most players that still get their frames on time) and the point
+where total throughput stops growing.
+
+    python basketball_loadtest.py --levels 1 2 4 8 16 32 --seconds 10
+
+While the ball moves, each watch frame reruns only the canvas fragment, as
+the fragment's run_every timer does in the browser, paced at the interval
+the app registered (the load controller may have stretched it).
+
+AppTest drives Streamlit's global Runtime singleton, so script runs are
+serialized behind one lock. That matches the GIL-bound server, where
+concurrent reruns share one core anyway, and the lock wait shows up in
+latency just like queueing for the GIL does.
+"""
+import argparse
+import dataclasses
+import json
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+import basketball_physics as physics
+from basketball_bench import APP_PATH, DRAG_GRID
+
+# A level keeps up when this share of animation frames arrive on time...
+ON_TIME_SHARE = 0.9
+
+# ...and 99% of reruns (aiming, shooting) answer within this many ms
+LATENCY_BUDGET_MS = 100
+
+_run_lock = threading.Lock()
+_last_run = threading.local()
+_next_run = threading.local()
+
+
+def install_metered_runner():
+    """AppTest's script runner, extended to record the script thread's CPU and the bytes it sent
+    and to rerun a single fragment"""
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests
+    from streamlit.testing.v1 import app_test
+
+    base = app_test.LocalScriptRunner
+    if getattr(base, "metered", False):
+        return
+
+    class MeteredScriptRunner(base):
+        metered = True
+        cpu_seconds = 0.0
+
+        # One compiled script for every run, like the server (AppTest recompiles on each run)
+        shared_script_cache = ScriptCache()
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._script_cache = self.shared_script_cache
+
+        def _run_script_thread(self):
+            started = time.thread_time()
+            try:
+                super()._run_script_thread()
+            finally:
+                self.cpu_seconds = time.thread_time() - started
+
+        def request_rerun(self, rerun_data):
+            # What the browser sends when a fragment's run_every timer fires
+            fragment_id = getattr(_next_run, "fragment_id", None)
+            if fragment_id:
+                # Every runner starts with a full rerun pending, which would swallow this one
+                self._requests = ScriptRequests()
+                rerun_data = dataclasses.replace(rerun_data, fragment_id_queue=[fragment_id], is_auto_rerun=True)
+            return super().request_rerun(rerun_data)
+
+        def run(self, *args, **kwargs):
+            tree = super().run(*args, **kwargs)
+            # Only what this run sent; the queue also keeps elements a fragment run left alone
+            messages = [data["forward_msg"] for data in self.event_data if "forward_msg" in data]
+            _last_run.cpu_seconds = self.cpu_seconds
+            _last_run.wire_bytes = sum(msg.ByteSize() for msg in messages)
+            # The fragment timer the run (re)registered, if any
+            _last_run.auto_rerun = next(
+                ((msg.auto_rerun.fragment_id, msg.auto_rerun.interval) for msg in messages if msg.HasField("auto_rerun")),
+                None
+            )
+            return tree
+
+    app_test.LocalScriptRunner = MeteredScriptRunner
+
+
+class Player:
+    """One scripted session and its measurements"""
+
+    def __init__(self, index, client_playback, timeout=60):
+        from streamlit.testing.v1 import AppTest
+
+        self.index = index
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.latencies = []
+        self.cpu_seconds = 0.0
+        self.wire_bytes = 0
+        self.frames = 0
+        self.late_frames = 0
+        self.shots = 0
+        self.shed_shots = 0
+        self.errors = 0
+        self.fragment_timer = None
+        self.run()
+        self.at.session_state.game.client_playback = client_playback
+
+    def run(self, fragment_id=None):
+        """One rerun of the script (or of just one fragment), timed from the request until it finished"""
+        started = time.perf_counter()
+        with _run_lock:
+            _next_run.fragment_id = fragment_id
+            try:
+                self.at.run()
+            finally:
+                _next_run.fragment_id = None
+        self.latencies.append(time.perf_counter() - started)
+
+        # A full run (re)declares the canvas fragment and its timer, or turns it off
+        auto_rerun = getattr(_last_run, "auto_rerun", None)
+        if auto_rerun or fragment_id is None:
+            self.fragment_timer = auto_rerun
+        self.cpu_seconds += getattr(_last_run, "cpu_seconds", 0.0)
+        self.wire_bytes += getattr(_last_run, "wire_bytes", 0)
+        if self.at.exception:
+            self.errors += 1
+
+    def play(self, deadline):
+        """Aim, shoot and watch the ball until the deadline"""
+        game = self.at.session_state.game
+        i = self.index
+        while time.monotonic() < deadline:
+            # Aim: a few preview reruns with the drag moving
+            game.show_trajectory = True
+            for _ in range(3):
+                dx, dy = DRAG_GRID[i % len(DRAG_GRID)]
+                game.drag_start = physics.BALL_START
+                game.drag_end = (physics.BALL_START[0] + dx, physics.BALL_START[1] + dy)
+                self.run()
+                i += 7
+
+            # Shoot
+            self.at.session_state.shoot = True
+            self.run()
+            self.shots += 1
+            if not game.client_playback and not game.ball_in_motion:
+                self.shed_shots += 1
+
+            # Watch: one fragment rerun per tick of the timer the app registered
+            next_frame = time.monotonic()
+            while game.ball_in_motion and self.fragment_timer and time.monotonic() < deadline:
+                fragment_id, interval = self.fragment_timer
+                next_frame += interval
+                delay = next_frame - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                self.run(fragment_id)
+                self.frames += 1
+                if time.monotonic() > next_frame + interval:
+                    self.late_frames += 1
+                    next_frame = time.monotonic()
+
+
+def run_level(players, seconds, client_playback):
+    """Start `players` sessions, let them play for `seconds`, and summarize"""
+    # Memory per session while the sessions are created and take their first rerun
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    sessions = [Player(i, client_playback) for i in range(players)]
+    footprint = (tracemalloc.get_traced_memory()[0] - baseline) / players
+    tracemalloc.stop()
+    for session in sessions:
+        session.latencies.clear()
+        session.cpu_seconds = session.wire_bytes = 0
+
+    deadline = time.monotonic() + seconds
+    threads = [threading.Thread(target=session.play, args=(deadline,), daemon=True) for session in sessions]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = np.concatenate([session.latencies for session in sessions]) * 1000
+    reruns = len(latencies)
+    frames = sum(session.frames for session in sessions)
+    late = sum(session.late_frames for session in sessions)
+    shots = sum(session.shots for session in sessions)
+    return {
+        "players": players,
+        "reruns_per_sec": round(reruns / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "max_ms": round(float(latencies.max()), 2),
+        "cpu_per_session_sec": round(sum(s.cpu_seconds for s in sessions) / players / elapsed, 4),
+        "cpu_per_rerun_ms": round(sum(s.cpu_seconds for s in sessions) / reruns * 1000, 3),
+        "memory_per_session_kb": round(footprint / 1024, 1),
+        "wire_bytes_per_rerun": int(sum(s.wire_bytes for s in sessions) / reruns),
+        "wire_bytes_per_session_sec": int(sum(s.wire_bytes for s in sessions) / players / elapsed),
+        "on_time_frames": round(1 - late / frames, 3) if frames else None,
+        "shed_shots": round(sum(s.shed_shots for s in sessions) / shots, 3) if shots else 0.0,
+        "errors": sum(session.errors for session in sessions)
+    }
+
+
+def knee(levels):
+    """Most players that still get frames on time and answers within budget, or None if even the first level fails"""
+    best = None
+    for level in levels:
+        on_time = level["on_time_frames"]
+        if (on_time is not None and on_time < ON_TIME_SHARE) or level["p99_ms"] > LATENCY_BUDGET_MS:
+            break
+        best = level["players"]
+    return best
+
+
+def saturation(levels, min_gain=1.1):
+    """Players at which total rerun throughput stops growing with more players"""
+    for previous, level in zip(levels, levels[1:]):
+        if level["reruns_per_sec"] < previous["reruns_per_sec"] * min_gain:
+            return previous["players"]
+    return None
+
+
+def run(levels, seconds, client_playback=False):
+    """Ramp through the concurrency levels; return the per-level results and the knee"""
+    install_metered_runner()
+
+    # Imports and process-wide caches are paid once, not by the first level's sessions
+    Player(0, client_playback)
+    results = []
+    for players in levels:
+        result = run_level(players, seconds, client_playback)
+        results.append(result)
+        print(json.dumps(result), flush=True)
+    return {"levels": results, "knee_players": knee(results), "saturation_players": saturation(results)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--seconds", type=float, default=10.0, help="play time per level")
+    parser.add_argument("--client-playback", action="store_true",
+                        help="animate shots in the browser instead of one rerun per frame")
+    parser.add_argument("--output", help="JSON file to write the results to")
+    args = parser.parse_args()
+
+    report = run(args.levels, args.seconds, args.client_playback)
+    print(f"Knee: {report['knee_players']} concurrent players on time, "
+          f"throughput saturates at {report['saturation_players']}")
+    if report["knee_players"] is None:
+        print(f"Even {args.levels[0]} player(s) missed frames or the latency budget: "
+              f"this machine is too slow to place the knee")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,197 @@
+"""Precomputed per-level scoring tables for the basketball game.
+
+A shot is fully determined by the level and the drag angle and power, so
+each level's quantized angle x power grid is simulated once and stored as a
+bitmap. The app then answers "does this shot score" and "what is the
+nearest scoring shot" with a couple of array lookups.
+
+The app loads the tables on a background thread when the process starts and
+gives no hint until they are ready, so no rerun ever waits for a build. Run
+`python basketball_lut.py` to build every table ahead of time and check that
+each level can actually be scored.
+"""
+import hashlib
+import math
+import os
+import sys
+import threading
+from collections import deque
+
+import numpy as np
+
+import basketball_physics as physics
+import basketball_trajectory as trajectory
+
+# Grid resolution: 0.5 degree by 1% power
+ANGLE_BINS = 720
+POWER_BINS = 150
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".lut_cache")
+
+
+def cell_index(angle, power):
+    """Grid cell of a shot given its angle (radians) and power"""
+    a = int((angle + math.pi) / (2 * math.pi) * ANGLE_BINS) % ANGLE_BINS
+    p = min(max(int(power / physics.MAX_POWER * POWER_BINS), 0), POWER_BINS - 1)
+    return a * POWER_BINS + p
+
+
+def cell_shot(index):
+    """Angle and power at the center of a grid cell"""
+    a, p = divmod(index, POWER_BINS)
+    angle = -math.pi + (a + 0.5) * 2 * math.pi / ANGLE_BINS
+    power = (p + 0.5) * physics.MAX_POWER / POWER_BINS
+    return angle, power
+
+
+def drag_shot(dx, dy):
+    """Angle and power of a drag vector, as `physics.launch_velocity` computes them"""
+    return math.atan2(dy, dx), min(math.sqrt(dx**2 + dy**2) / physics.POWER_DISTANCE, physics.MAX_POWER)
+
+
+class ScoringTable:
+    """Scoring bitmap for one level plus the nearest scoring cell of every cell"""
+    __slots__ = ("level", "bits", "nearest")
+
+    def __init__(self, level, bits, nearest):
+        self.level = level
+        self.bits = bits
+        self.nearest = nearest
+
+    @property
+    def count(self):
+        """Number of scoring cells"""
+        return int(np.unpackbits(self.bits).sum())
+
+    def scores(self, angle, power):
+        """True if a shot with this angle and power scores"""
+        i = cell_index(angle, power)
+        return bool((self.bits[i >> 3] >> (7 - (i & 7))) & 1)
+
+    def nearest_shot(self, angle, power):
+        """Closest scoring (angle, power) on the grid, or None if the level cannot be scored"""
+        j = int(self.nearest[cell_index(angle, power)])
+        return cell_shot(j) if j >= 0 else None
+
+
+def _nearest_cells(mask):
+    """Multi-source BFS over the grid (angle wraps around): nearest scoring cell per cell"""
+    nearest = np.full(mask.size, -1, dtype=np.int32)
+    queue = deque(int(i) for i in np.flatnonzero(mask))
+    for i in queue:
+        nearest[i] = i
+    while queue:
+        i = queue.popleft()
+        a, p = divmod(i, POWER_BINS)
+        neighbors = [((a + 1) % ANGLE_BINS) * POWER_BINS + p, ((a - 1) % ANGLE_BINS) * POWER_BINS + p]
+        if p + 1 < POWER_BINS:
+            neighbors.append(i + 1)
+        if p > 0:
+            neighbors.append(i - 1)
+        for j in neighbors:
+            if nearest[j] < 0:
+                nearest[j] = nearest[i]
+                queue.append(j)
+    return nearest
+
+
+def build_table(level):
+    """Simulate every cell of a level's grid and return its ScoringTable"""
+    angles, powers = cell_shot(np.arange(ANGLE_BINS * POWER_BINS))
+    vx = np.cos(angles) * powers * physics.SPEED_SCALE
+    vy = np.sin(angles) * powers * physics.SPEED_SCALE
+    start_x, start_y = physics.BALL_START
+    result = trajectory.evaluate(
+        start_x, start_y, vx, vy, physics.hoop_for(level), physics.MAX_STEPS, record=False
+    )
+    return ScoringTable(level, np.packbits(result.scored), _nearest_cells(result.scored))
+
+
+def _cache_key(level):
+    """Changes whenever anything that affects a level's outcomes changes"""
+    inputs = (
+        physics.ENGINE_VERSION, physics.LEVEL_CONFIG[level], physics.GRAVITY, physics.FRICTION,
+        physics.BOUNCE_DAMPENING, physics.BALL_START, physics.BALL_SIZE, physics.BALL_RADIUS,
+        physics.FLOOR_Y, physics.WALL_RIGHT, physics.REST_SPEED, physics.MAX_STEPS,
+        physics.MAX_POWER, physics.SPEED_SCALE, ANGLE_BINS, POWER_BINS
+    )
+    return hashlib.sha1(repr(inputs).encode()).hexdigest()[:12]
+
+
+def load_table(level, cache_dir=CACHE_DIR):
+    """Load a level's table from the disk cache, building and saving it if missing"""
+    path = os.path.join(cache_dir, f"level{level}-{_cache_key(level)}.npz")
+    try:
+        with np.load(path) as data:
+            return ScoringTable(level, data["bits"], data["nearest"])
+    except (OSError, KeyError, ValueError):
+        pass
+
+    table = build_table(level)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_path, bits=table.bits, nearest=table.nearest)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Cache directory not writable: keep the table in memory and rebuild it next process
+        pass
+    return table
+
+
+def load_all(cache_dir=CACHE_DIR):
+    """Tables for every level, keyed by level"""
+    return {level: load_table(level, cache_dir) for level in physics.LEVEL_CONFIG}
+
+
+class TableLoader:
+    """Loads every level's table on a background thread; lookups never wait for it"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.tables = None
+        self._thread = threading.Thread(target=self._load, args=(cache_dir,), name="lut-loader", daemon=True)
+        self._thread.start()
+
+    def _load(self, cache_dir):
+        self.tables = load_all(cache_dir)
+
+    def get(self, level):
+        """A level's table, or None while the tables are still loading"""
+        tables = self.tables
+        return tables[level] if tables else None
+
+    def wait(self, timeout=None):
+        """Block until the tables are loaded (or the timeout passes); True once they are"""
+        self._thread.join(timeout)
+        return self.tables is not None
+
+
+def aim_hint(table, dx, dy):
+    """Short aim-assist text pointing a missed drag towards the nearest scoring shot"""
+    angle, power = drag_shot(dx, dy)
+    target = table.nearest_shot(angle, power)
+    if target is None:
+        return ""
+
+    hints = []
+    # Screen y grows downwards, so a smaller angle aims higher
+    turn = (target[0] - angle + math.pi) % (2 * math.pi) - math.pi
+    if abs(turn) > math.pi / ANGLE_BINS:
+        hints.append("aim higher" if turn < 0 else "aim lower")
+    if abs(target[1] - power) > physics.MAX_POWER / POWER_BINS:
+        hints.append("more power" if target[1] > power else "less power")
+    return "Try to " + " and ".join(hints) if hints else ""
+
+
+def validate_levels(tables):
+    """Scoring-cell count per level; a level with none can never reach its par"""
+    return {level: table.count for level, table in tables.items()}
+
+
+if __name__ == "__main__":
+    counts = validate_levels(load_all())
+    for level, count in counts.items():
+        status = "ok" if count else "UNREACHABLE"
+        print(f"Level {level}: {count} scoring shots of {ANGLE_BINS * POWER_BINS} "
+              f"(par {physics.LEVEL_CONFIG[level]['par']}) {status}")
+    sys.exit(0 if all(counts.values()) else 1)
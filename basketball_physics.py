@@ -0,0 +1,233 @@
+"""Headless physics engine for the basketball game.
+
+No Streamlit in here: the app, benchmarks and replay tools all advance the
+ball through the same `step()` so a shot behaves identically everywhere.
+One step is one animation frame (FRAME_SECONDS of game time).
+"""
+import math
+from typing import NamedTuple
+
+# Bump whenever step() changes the outcome of a shot (invalidates cached tables)
+ENGINE_VERSION = 1
+
+# Game constants
+LEVEL_CONFIG = {
+    1: {"hoop_x": 700, "hoop_y": 200, "hoop_radius": 22, "distance": 550, "par": 5},
+    2: {"hoop_x": 750, "hoop_y": 180, "hoop_radius": 20, "distance": 600, "par": 4},
+    3: {"hoop_x": 800, "hoop_y": 160, "hoop_radius": 18, "distance": 650, "par": 3},
+    4: {"hoop_x": 850, "hoop_y": 150, "hoop_radius": 16, "distance": 700, "par": 3},
+    5: {"hoop_x": 900, "hoop_y": 140, "hoop_radius": 14, "distance": 750, "par": 2}
+}
+
+# Physics constants
+GRAVITY = 0.5
+BOUNCE_DAMPENING = 0.7
+FRICTION = 0.98
+
+# Fixed timestep: one step per frame
+FRAME_SECONDS = 0.03
+
+# Court geometry in px (ball position is its top-left corner, like the renderer)
+BALL_START = (150, 400)
+BALL_SIZE = 40
+BALL_RADIUS = BALL_SIZE / 2
+FLOOR_Y = 460
+WALL_RIGHT = 960
+REST_SPEED = 0.5
+MAX_POWER = 1.5
+POWER_DISTANCE = 150
+SPEED_SCALE = 15
+
+# Safety net so a shot always ends
+MAX_STEPS = 2000
+
+# Step events
+IN_FLIGHT = 0
+SCORED = 1
+RESTED = 2
+
+
+class Ball(NamedTuple):
+    """Ball position (top-left corner) and velocity in px per step"""
+    x: float
+    y: float
+    vx: float = 0.0
+    vy: float = 0.0
+
+
+class Hoop(NamedTuple):
+    """Hoop center and radius in px"""
+    x: float
+    y: float
+    radius: float
+
+
+def hoop_for(level):
+    """Return the hoop geometry for a level"""
+    config = LEVEL_CONFIG[level]
+    return Hoop(config["hoop_x"], config["hoop_y"], config["hoop_radius"])
+
+
+def start_ball():
+    """Return a ball at rest at the shooting spot"""
+    return Ball(*BALL_START)
+
+
+def launch_velocity(dx, dy):
+    """Convert a drag vector into the initial ball velocity"""
+    angle = math.atan2(dy, dx)
+    power = min(math.sqrt(dx**2 + dy**2) / POWER_DISTANCE, MAX_POWER)
+    return math.cos(angle) * power * SPEED_SCALE, math.sin(angle) * power * SPEED_SCALE
+
+
+def _segment_hits_circle(px, py, dx, dy, cx, cy, radius):
+    """True if the segment from (px, py) along (dx, dy) passes within radius of (cx, cy)"""
+    fx = cx - px
+    fy = cy - py
+    length2 = dx * dx + dy * dy
+    t = (fx * dx + fy * dy) / length2 if length2 else 0.0
+    if t < 0.0:
+        t = 0.0
+    elif t > 1.0:
+        t = 1.0
+    ex = fx - t * dx
+    ey = fy - t * dy
+    return ex * ex + ey * ey < radius * radius
+
+
+def advance_frames(x, y, vx, vy, frames):
+    """Ball after `frames` unit steps with nothing in the way, in closed form
+
+    Each frame adds gravity and then applies friction, so vy approaches a
+    terminal speed geometrically and the positions sum a geometric series.
+    Works on floats or NumPy arrays.
+    """
+    decay = FRICTION ** frames
+    terminal = GRAVITY * FRICTION / (1.0 - FRICTION)
+    flown = FRICTION * (1.0 - decay) / (1.0 - FRICTION)
+    return (x + vx * flown, y + terminal * frames + (vy - terminal) * flown,
+            vx * decay, terminal + (vy - terminal) * decay)
+
+
+def apex_frame(vy):
+    """Last frame on which a ball launched with vy is still rising (0 if it is not)"""
+    if vy >= 0:
+        return 0
+    terminal = GRAVITY * FRICTION / (1.0 - FRICTION)
+    return max(math.ceil(math.log(terminal / (terminal - vy)) / math.log(FRICTION)) - 1, 0)
+
+
+def _step_frames(ball, hoop, frames):
+    """`frames` unit steps at once; the closed form when the ball can't touch anything"""
+    x0, y0, vx, vy = ball
+    x, y, _, _ = end = advance_frames(x0, y0, vx, vy, frames)
+
+    # x only moves one way without a wall bounce, and the fall speed only grows or
+    # only shrinks, so the lowest point is at the first or last frame
+    _, y1, _, _ = advance_frames(x0, y0, vx, vy, 1)
+    if max(y1, y) < FLOOR_Y and 0 <= x <= WALL_RIGHT:
+        # Box around every ball centre on the path; the top is at the apex,
+        # checked on either side in case the float apex frame is off by one
+        apex = min(apex_frame(vy), frames)
+        top = min(advance_frames(x0, y0, vx, vy, n)[1] for n in {max(apex - 1, 0), apex, min(apex + 1, frames)})
+        left, right = min(x0, x) + BALL_RADIUS, max(x0, x) + BALL_RADIUS
+        top, bottom = min(top, y0) + BALL_RADIUS, max(y0, y) + BALL_RADIUS
+        gap_x = max(left - hoop.x, hoop.x - right, 0.0)
+        gap_y = max(top - hoop.y, hoop.y - bottom, 0.0)
+        if gap_x * gap_x + gap_y * gap_y >= hoop.radius * hoop.radius:
+            return Ball(*end), IN_FLIGHT
+
+    # Something is within reach: take the frames one by one
+    event = IN_FLIGHT
+    for _ in range(frames):
+        ball, event = step(ball, hoop)
+        if event != IN_FLIGHT:
+            break
+    return ball, event
+
+
+def step(ball, hoop, dt=1.0):
+    """Advance the ball by dt frames; return (ball, event)
+
+    A whole number of frames has the same outcome as that many dt=1 steps:
+    stretches where the ball can't reach the hoop, the floor or a wall use the
+    closed form, the rest goes frame by frame. A fractional dt is a single
+    Euler step scaled by dt, an approximation whose shots can end differently.
+    Collisions are swept over the step either way, so nothing tunnels.
+    """
+    if dt > 1 and dt == int(dt):
+        return _step_frames(ball, hoop, int(dt))
+
+    x0, y0, vx, vy = ball
+
+    # Apply gravity
+    vy += GRAVITY * dt
+
+    # Apply friction
+    friction = FRICTION if dt == 1.0 else FRICTION ** dt
+    vx *= friction
+    vy *= friction
+
+    # Update position
+    x = x0 + vx * dt
+    y = y0 + vy * dt
+
+    # Fraction of the step flown before touching the floor
+    reach = 1.0
+    if y >= FLOOR_Y and y > y0:
+        reach = max(FLOOR_Y - y0, 0.0) / (y - y0)
+
+    event = IN_FLIGHT
+
+    # Ball is falling through the hoop somewhere along the step
+    if vy > 0 and _segment_hits_circle(
+        x0 + BALL_RADIUS, y0 + BALL_RADIUS, vx * dt * reach, vy * dt * reach,
+        hoop.x, hoop.y, hoop.radius
+    ):
+        event = SCORED
+
+    # Boundary collision (floor): bounce at the moment of impact
+    if y >= FLOOR_Y:
+        vy = -vy * BOUNCE_DAMPENING
+        vx *= FRICTION * 0.9
+        y = FLOOR_Y + vy * dt * (1.0 - reach)
+
+        # Ball has almost stopped (a bounce gravity cancels within two steps counts as stopped)
+        if event == IN_FLIGHT and abs(vx) < REST_SPEED and abs(vy) < REST_SPEED + 2 * GRAVITY * dt:
+            event = RESTED
+
+    # Boundary collision (walls): reflect the overshoot back into the court
+    if x < 0:
+        x = -x * BOUNCE_DAMPENING
+        vx = -vx * BOUNCE_DAMPENING
+    elif x > WALL_RIGHT:
+        x = WALL_RIGHT - (x - WALL_RIGHT) * BOUNCE_DAMPENING
+        vx = -vx * BOUNCE_DAMPENING
+
+    return Ball(x, y, vx, vy), event
+
+
+class Shot(NamedTuple):
+    """A fully simulated shot: ball positions per frame, how it ended and the exact final ball"""
+    frames: list
+    event: int
+    scored_at: int
+    final: Ball
+
+
+def simulate(ball, hoop, dt=1.0, max_steps=MAX_STEPS):
+    """Run a shot until it scores or comes to rest; frames[0] is the launch spot
+
+    Each frame is dt animation frames apart.
+    """
+    frames = [(round(ball.x, 1), round(ball.y, 1))]
+    event = RESTED
+    for _ in range(max_steps):
+        ball, event = step(ball, hoop, dt)
+        frames.append((round(ball.x, 1), round(ball.y, 1)))
+        if event != IN_FLIGHT:
+            break
+    else:
+        event = RESTED
+    scored_at = len(frames) - 1 if event == SCORED else -1
+    return Shot(frames, event, scored_at, ball)
@@ -0,0 +1,132 @@
+"""Opt-in per-rerun timing for the basketball game.
+
+Off by default and close to free when off. Set BASKETBALL_PROFILE=1 to
+record the wall time of each phase of a rerun and the HTML bytes it sent,
+aggregated as percentiles across every session in the process. Set
+BASKETBALL_PROFILE_SAMPLE to a fraction (e.g. 0.01) to also dump a cProfile
+of that share of reruns into BASKETBALL_PROFILE_DIR, readable with pstats.
+"""
+import cProfile
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+ENABLED = os.environ.get("BASKETBALL_PROFILE", "") not in ("", "0")
+PROFILE_SAMPLE = float(os.environ.get("BASKETBALL_PROFILE_SAMPLE", "0") or 0)
+PROFILE_DIR = os.environ.get(
+    "BASKETBALL_PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".profiles")
+)
+
+# Samples kept per phase for the percentiles
+WINDOW = 2048
+
+PERCENTILES = (50, 90, 99)
+
+_NO_PHASE = nullcontext()
+
+
+class RerunStats:
+    """Process-wide sliding window of phase timings and payload sizes"""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.reruns = 0
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, value):
+        """Record one sample for a phase (seconds) or a byte counter"""
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(value)
+
+    def percentiles(self, percentiles=PERCENTILES):
+        """{name: {"count": n, "p50": v, ...}} over the current window"""
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._samples.items()}
+        table = {}
+        for name, values in snapshot.items():
+            row = {"count": len(values)}
+            for p in percentiles:
+                row[f"p{p}"] = values[min(len(values) * p // 100, len(values) - 1)]
+            table[name] = row
+        return table
+
+    def report(self):
+        """Percentile table with times in ms, one row per phase"""
+        rows = []
+        for name, row in sorted(self.percentiles().items()):
+            scale = 1 if name.endswith("bytes") else 1000
+            rows.append({"phase": name, "count": row["count"],
+                         **{key: round(value * scale, 3) for key, value in row.items() if key != "count"}})
+        return rows
+
+
+class RerunTimer:
+    """Times the phases of one rerun; a disabled timer does nothing"""
+
+    def __init__(self, stats, kind, enabled=ENABLED, sample=PROFILE_SAMPLE):
+        self.stats = stats
+        self.kind = kind
+        self.enabled = enabled
+        self.started = self._mark = time.perf_counter()
+        self.profiler = None
+        if enabled and sample and random.random() < sample:
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                # Another session's sampled rerun holds the profiler hook
+                self.profiler = None
+
+    def lap(self, name):
+        """Record the time since the previous lap (or the rerun start) as a phase"""
+        if self.enabled:
+            now = time.perf_counter()
+            self.stats.add(name, now - self._mark)
+            self._mark = now
+
+    def phase(self, name):
+        """Context manager timing one named phase of the rerun"""
+        if not self.enabled:
+            return _NO_PHASE
+        return self._phase(name)
+
+    @contextmanager
+    def _phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._mark = time.perf_counter()
+            self.stats.add(name, self._mark - started)
+
+    def abandon(self):
+        """Stop a sampled profile without saving it (the rerun was cut short by st.rerun)"""
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler = None
+
+    def finish(self, payload_bytes):
+        """Record the rerun's total time and payload, and dump its profile if sampled"""
+        if not self.enabled:
+            return
+        self.stats.add(f"{self.kind} rerun", time.perf_counter() - self.started)
+        self.stats.add(f"{self.kind} bytes", payload_bytes)
+        self.stats.reruns += 1
+
+        if self.profiler is not None:
+            self.profiler.disable()
+            try:
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                self.profiler.dump_stats(
+                    os.path.join(PROFILE_DIR, f"{self.kind}-{os.getpid()}-{time.time_ns()}.prof")
+                )
+            except OSError:
+                pass
+            self.profiler = None
@@ -0,0 +1,119 @@
+"""Page HTML and canvas scene data for the basketball game.
+
+The page around the game is HTML that depends on nothing or only on the
+level, so each fragment is built once per process and reused by every
+rerun of every session. The game itself is drawn by the canvas component
+from compact numbers (hoop geometry, ball position, trajectory points).
+"""
+from functools import lru_cache
+
+import basketball_physics as physics
+from basketball_physics import LEVEL_CONFIG
+
+# Points in the aim preview
+TRAJECTORY_STEPS = 20
+
+# Aim previews are memoized on the drag vector rounded to this many px
+PREVIEW_QUANTUM = 2
+PREVIEW_CACHE_SIZE = 4096
+
+# CSS for the page around the game (stats, level bar, result message)
+PAGE_CSS = """
+<style>
+    /* Score and level display */
+    .stats-container {
+        display: flex;
+        justify-content: space-between;
+        background-color: #2E8B57;
+        color: white;
+        padding: 15px;
+        border-radius: 10px;
+        margin-bottom: 15px;
+        box-shadow: 0 5px 10px rgba(0,0,0,0.1);
+        font-family: 'Arial Black', sans-serif;
+    }
+    
+    .stat-box {
+        text-align: center;
+        flex: 1;
+    }
+    
+    .stat-value {
+        font-size: 28px;
+        font-weight: bold;
+        color: #FFD700;
+    }
+    
+    .stat-label {
+        font-size: 14px;
+        opacity: 0.9;
+        margin-top: 5px;
+    }
+    
+    /* Level indicator */
+    .level-indicator {
+        display: flex;
+        justify-content: center;
+        margin-bottom: 15px;
+    }
+    
+    .level-circle {
+        width: 40px;
+        height: 40px;
+        border-radius: 50%;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        margin: 0 5px;
+        font-weight: bold;
+        color: white;
+        box-shadow: 0 3px 6px rgba(0,0,0,0.2);
+    }
+    
+    /* Result message */
+    .result-message {
+        text-align: center;
+        font-size: 24px;
+        font-weight: bold;
+        padding: 10px;
+        border-radius: 5px;
+        margin: 10px 0;
+        animation: fadeIn 0.5s;
+    }
+    
+    @keyframes fadeIn {
+        from { opacity: 0; }
+        to { opacity: 1; }
+    }
+</style>
+"""
+
+
+@lru_cache(maxsize=None)
+def draw_level_indicator(level):
+    """Draw the row of level circles for the current level"""
+    level_html = '<div class="level-indicator">'
+    for i in LEVEL_CONFIG:
+        if i == level:
+            bg_color = "#FF4500"
+        elif i < level:
+            bg_color = "#32CD32"
+        else:
+            bg_color = "#C0C0C0"
+        
+        level_html += f'<div class="level-circle" style="background-color: {bg_color};">{i}</div>'
+    level_html += '</div>'
+    return level_html
+
+
+@lru_cache(maxsize=PREVIEW_CACHE_SIZE)
+def trajectory_points(level, start, dx, dy):
+    """Aim preview for a drag vector as a flat [x0, y0, x1, y1, ...] list of ball centers
+
+    Simulated with the game's own physics step; the canvas strokes the
+    segments with fading opacity. Serves scripted sessions only: in the
+    browser the component previews the drag with its own port of the step.
+    """
+    ball = physics.Ball(*start, *physics.launch_velocity(dx, dy))
+    shot = physics.simulate(ball, physics.hoop_for(level), max_steps=TRAJECTORY_STEPS - 1)
+    return tuple(round(v + physics.BALL_RADIUS, 1) for frame in shot.frames for v in frame)
@@ -0,0 +1,142 @@
+"""Shot recording and deterministic replay for the basketball game.
+
+A shot is fully determined by the level, the launch spot, the drag vector
+and the physics engine, so the log keeps just those plus the outcome the
+engine produced: 66 bytes per shot, appended to a binary file. Replaying re-simulates each
+shot with no rendering and checks the outcome is bit-identical, which
+reproduces player reports and shows whether a physics change alters any
+recorded game.
+
+    python basketball_replay.py .shot_log/shots.bin             # verify every shot
+    python basketball_replay.py .shot_log/shots.bin --session 42 --dump
+"""
+import argparse
+import os
+import struct
+import sys
+import threading
+import time
+from typing import NamedTuple
+
+import basketball_physics as physics
+
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sB")
+_MAGIC = b"BBSL"
+
+# time, session, engine version, level, launch x/y, drag dx/dy, event, steps, final ball x/y
+_RECORD = struct.Struct("<dIHBddddBHdd")
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".shot_log", "shots.bin")
+
+
+class ShotRecord(NamedTuple):
+    """One logged shot: its inputs and the outcome the engine gave at the time"""
+    time: float
+    session: int
+    engine_version: int
+    level: int
+    start_x: float
+    start_y: float
+    dx: float
+    dy: float
+    event: int
+    steps: int
+    x: float
+    y: float
+
+
+def replay_shot(level, start, dx, dy):
+    """Simulate a shot from its inputs; return (event, steps, final x, final y)"""
+    ball = physics.Ball(*start, *physics.launch_velocity(dx, dy))
+    shot = physics.simulate(ball, physics.hoop_for(level))
+    return shot.event, len(shot.frames) - 1, shot.final.x, shot.final.y
+
+
+class ShotLog:
+    """Append-only binary shot log; safe to share between threads and processes"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._fd = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        try:
+            # Whoever creates the file writes the header
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL, 0o644)
+            os.write(fd, _HEADER.pack(_MAGIC, FORMAT_VERSION))
+        except FileExistsError:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        return fd
+
+    def append(self, session, level, start, dx, dy, shot):
+        """Record a shot `physics.simulate` ran from `start` with the drag's launch velocity"""
+        with self._lock:
+            if self._fd is None:
+                self._fd = self._open()
+        record = _RECORD.pack(
+            time.time(), session, physics.ENGINE_VERSION, level, *start, dx, dy,
+            shot.event, len(shot.frames) - 1, shot.final.x, shot.final.y
+        )
+        # One write per record: O_APPEND keeps concurrent writers from interleaving
+        os.write(self._fd, record)
+
+    def close(self):
+        """Close the log file (the next append reopens it)"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def read_log(path):
+    """Yield every complete ShotRecord in a log (a torn last record is skipped)"""
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        magic, version = _HEADER.unpack(header)
+        if magic != _MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} shot log")
+        data = f.read()
+    usable = len(data) - len(data) % _RECORD.size
+    for fields in _RECORD.iter_unpack(data[:usable]):
+        yield ShotRecord(*fields)
+
+
+def verify(records):
+    """Replay records and return the ones whose outcome no longer matches"""
+    mismatches = []
+    for record in records:
+        outcome = replay_shot(record.level, (record.start_x, record.start_y), record.dx, record.dy)
+        if outcome != (record.event, record.steps, record.x, record.y):
+            mismatches.append((record, outcome))
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--session", type=int, help="only shots from this session")
+    parser.add_argument("--dump", action="store_true", help="print every shot")
+    args = parser.parse_args()
+
+    records = [r for r in read_log(args.path) if args.session is None or r.session == args.session]
+    if args.dump:
+        for r in records:
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(r.time))} session {r.session} "
+                  f"engine {r.engine_version} level {r.level} drag ({r.dx}, {r.dy}) "
+                  f"{'scored' if r.event == physics.SCORED else 'missed'} after {r.steps} steps")
+
+    started = time.perf_counter()
+    mismatches = verify(records)
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {len(records)} shots in {elapsed:.2f}s ({len(records) / max(elapsed, 1e-9):.0f} shots/s), "
+          f"{len(mismatches)} changed under engine {physics.ENGINE_VERSION}")
+    for record, (event, steps, x, y) in mismatches[:20]:
+        print(f"  session {record.session} level {record.level} drag ({record.dx}, {record.dy}): "
+              f"recorded event {record.event} after {record.steps} steps at ({record.x}, {record.y}), "
+              f"now event {event} after {steps} steps at ({x}, {y})")
+    sys.exit(1 if mismatches else 0)
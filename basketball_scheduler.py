@@ -0,0 +1,205 @@
+"""Process-wide batched physics ticks for the basketball game.
+
+Instead of every animating session stepping its own ball in pure Python,
+sessions hand their shot to one TickScheduler. A single background thread
+advances every in-flight ball of every session with one vectorized step
+per tick, and each session's fragment just reads back its latest position.
+"""
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import basketball_physics as physics
+from basketball_trajectory import step_arrays
+
+# Finished balls nobody polls (closed tabs) are reclaimed after this many ticks
+RECLAIM_TICKS = 300
+
+
+class TickScheduler:
+    """Holds all in-flight balls in NumPy arrays and steps them together"""
+
+    def __init__(self, period=physics.FRAME_SECONDS, capacity=64):
+        self.period = period
+        self.tick = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Create (or grow) the slot arrays, keeping existing slots"""
+        old = getattr(self, "_x", None)
+        size = 0 if old is None else old.shape[0]
+
+        def grow(name, dtype, fill):
+            array = np.full(capacity, fill, dtype=dtype)
+            if size:
+                array[:size] = getattr(self, name)
+            setattr(self, name, array)
+
+        for name in ("_x", "_y", "_vx", "_vy", "_hoop_x", "_hoop_y", "_hoop_radius"):
+            grow(name, np.float64, 0.0)
+        grow("_event", np.int8, physics.IN_FLIGHT)
+        grow("_active", bool, False)
+        grow("_used", bool, False)
+        grow("_finished_tick", np.int64, 0)
+        grow("_generation", np.int64, 0)
+
+    @property
+    def active_count(self):
+        """Balls currently in flight"""
+        return int(self._active.sum())
+
+    def launch(self, ball, hoop):
+        """Add a ball in flight; return the handle to poll it with"""
+        with self._lock:
+            free = np.flatnonzero(~self._used)
+            if not free.size:
+                self._allocate(self._x.shape[0] * 2)
+                free = np.flatnonzero(~self._used)
+            slot = int(free[0])
+            self._x[slot], self._y[slot], self._vx[slot], self._vy[slot] = ball
+            self._hoop_x[slot], self._hoop_y[slot], self._hoop_radius[slot] = hoop
+            self._event[slot] = physics.IN_FLIGHT
+            self._active[slot] = True
+            self._used[slot] = True
+            self._generation[slot] += 1
+            handle = (slot, int(self._generation[slot]))
+            self._ensure_running()
+            self._wake.notify()
+        return handle
+
+    def poll(self, handle):
+        """Latest (x, y, event) of a ball, or None if the handle is no longer valid"""
+        slot, generation = handle
+        # Under the lock, so x, y and the event all come from the same tick
+        with self._lock:
+            if not self._used[slot] or self._generation[slot] != generation:
+                return None
+            return float(self._x[slot]), float(self._y[slot]), int(self._event[slot])
+
+    def release(self, handle):
+        """Free a ball's slot once its session is done with it"""
+        slot, generation = handle
+        with self._lock:
+            if self._generation[slot] == generation:
+                self._active[slot] = False
+                self._used[slot] = False
+
+    def step_all(self, dt=1.0):
+        """Advance every in-flight ball by one step in a single vectorized call"""
+        with self._lock:
+            self.tick += 1
+            idx = np.flatnonzero(self._active)
+            if idx.size:
+                x, y, vx, vy, hit, rested = step_arrays(
+                    self._x[idx], self._y[idx], self._vx[idx], self._vy[idx],
+                    self._hoop_x[idx], self._hoop_y[idx], self._hoop_radius[idx], dt
+                )
+                self._x[idx], self._y[idx], self._vx[idx], self._vy[idx] = x, y, vx, vy
+
+                done = hit | rested
+                self._event[idx[hit]] = physics.SCORED
+                self._event[idx[rested]] = physics.RESTED
+                self._active[idx[done]] = False
+                self._finished_tick[idx[done]] = self.tick
+
+            # Reclaim finished balls whose session went away
+            stale = self._used & ~self._active & (self._finished_tick < self.tick - RECLAIM_TICKS)
+            self._used[stale] = False
+            return int(idx.size)
+
+    def _ensure_running(self):
+        """Start the tick thread on first use (caller holds the lock)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="basketball-ticks", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Tick at a fixed period while any ball is in flight, otherwise wait for a launch"""
+        deadline = time.monotonic()
+        while True:
+            with self._lock:
+                while not self._active.any():
+                    self._wake.wait()
+                    deadline = time.monotonic()
+            self.step_all()
+            deadline += self.period
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind: drop the missed ticks instead of bursting
+                deadline = time.monotonic()
+
+
+class LoadController:
+    """Adapts the server animation rate to load and sheds animations past capacity
+
+    Every animating session reruns its canvas fragment once per period, so
+    the process needs about `animating * rerun_latency / period` of CPU.
+    Above the high-water mark the period doubles (the browser gets fewer,
+    bigger ball moves); well below the low-water mark it halves again. New
+    shots over `max_animating`, or while even the slowest rate is
+    saturated, are played back client-side instead.
+    """
+
+    def __init__(self, frame_seconds=physics.FRAME_SECONDS, max_stride=4, max_animating=200,
+                 high_water=0.7, low_water=0.3, window=256, interval=1.0):
+        self.frame_seconds = frame_seconds
+        self.max_stride = max_stride
+        self.max_animating = max_animating
+        self.high_water = high_water
+        self.low_water = low_water
+        self.interval = interval
+        self.stride = 1
+        self._latencies = deque(maxlen=window)
+        self._next_update = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def period(self):
+        """Seconds between server-side animation updates"""
+        return self.frame_seconds * self.stride
+
+    def record(self, seconds):
+        """Report how long one animation rerun took"""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _utilization(self, animating):
+        """`utilization` for a caller that holds the lock"""
+        if not self._latencies:
+            return 0.0
+        latency = sorted(self._latencies)[len(self._latencies) * 9 // 10]
+        return animating * latency / self.period
+
+    def utilization(self, animating):
+        """Estimated CPU share the animating sessions need at the current period"""
+        with self._lock:
+            return self._utilization(animating)
+
+    def update(self, animating):
+        """Re-pick the stride for the current number of animating sessions (at most once per interval)"""
+        # Every animating session calls this; only one of them may take each interval's step
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_update:
+                return self.stride
+            self._next_update = now + self.interval
+
+            load = self._utilization(animating)
+            if load > self.high_water and self.stride < self.max_stride:
+                self.stride *= 2
+            elif load * 2 < self.low_water and self.stride > 1:
+                self.stride //= 2
+            return self.stride
+
+    def admit(self, animating):
+        """True if one more session may animate server-side"""
+        if animating >= self.max_animating:
+            return False
+        return self.stride < self.max_stride or self.utilization(animating + 1) <= self.high_water
@@ -0,0 +1,100 @@
+"""Per-session game state for the basketball game.
+
+One slotted object replaces the dozen loose `st.session_state` keys the app
+used to keep. It snapshots to a compact binary record (about 80 bytes plus
+the result text) so sessions can be persisted, restored or migrated.
+"""
+import struct
+from dataclasses import dataclass
+
+from basketball_physics import BALL_START
+
+# Bump when the binary layout changes
+STATE_VERSION = 1
+
+# version, score, level, shots_taken, shots_made, flags,
+# ball x/y, ball vx/vy, drag start x/y, drag end x/y, result text length
+_RECORD = struct.Struct("<BiBHHB8dH")
+
+_GAME_ACTIVE = 1
+_BALL_IN_MOTION = 2
+_SHOW_TRAJECTORY = 4
+_CLIENT_PLAYBACK = 8
+_HAS_DRAG_START = 16
+_HAS_DRAG_END = 32
+
+
+@dataclass(slots=True)
+class GameState:
+    """Everything one player's game needs between reruns"""
+    score: int = 0
+    level: int = 1
+    shots_taken: int = 0
+    shots_made: int = 0
+    game_active: bool = True
+    drag_start: tuple = None
+    drag_end: tuple = None
+    ball_pos: tuple = BALL_START
+    ball_velocity: tuple = (0.0, 0.0)
+    ball_in_motion: bool = False
+    show_trajectory: bool = False
+    last_shot_result: str = ""
+    client_playback: bool = True
+
+    # Transient: not part of snapshots
+    playback: dict = None
+    celebrate_until: float = None
+    ball_slot: tuple = None
+    canvas_shown: dict = None
+    canvas_rev: int = 0
+
+    def snapshot(self):
+        """Serialize the persistent fields to bytes"""
+        flags = (
+            (_GAME_ACTIVE if self.game_active else 0)
+            | (_BALL_IN_MOTION if self.ball_in_motion else 0)
+            | (_SHOW_TRAJECTORY if self.show_trajectory else 0)
+            | (_CLIENT_PLAYBACK if self.client_playback else 0)
+            | (_HAS_DRAG_START if self.drag_start else 0)
+            | (_HAS_DRAG_END if self.drag_end else 0)
+        )
+        result = self.last_shot_result.encode()
+        return _RECORD.pack(
+            STATE_VERSION, self.score, self.level, self.shots_taken, self.shots_made, flags,
+            *self.ball_pos, *self.ball_velocity,
+            *(self.drag_start or (0.0, 0.0)), *(self.drag_end or (0.0, 0.0)),
+            len(result)
+        ) + result
+
+    def restore(self, data):
+        """Load a snapshot into this object in place (transient fields are cleared)"""
+        (version, score, level, shots_taken, shots_made, flags,
+         x, y, vx, vy, sx, sy, ex, ey, result_length) = _RECORD.unpack_from(data)
+        if version != STATE_VERSION:
+            raise ValueError(f"Unsupported game state version {version}")
+
+        self.score = score
+        self.level = level
+        self.shots_taken = shots_taken
+        self.shots_made = shots_made
+        self.game_active = bool(flags & _GAME_ACTIVE)
+        self.ball_in_motion = bool(flags & _BALL_IN_MOTION)
+        self.show_trajectory = bool(flags & _SHOW_TRAJECTORY)
+        self.client_playback = bool(flags & _CLIENT_PLAYBACK)
+        self.drag_start = (sx, sy) if flags & _HAS_DRAG_START else None
+        self.drag_end = (ex, ey) if flags & _HAS_DRAG_END else None
+        self.ball_pos = (x, y)
+        self.ball_velocity = (vx, vy)
+        self.last_shot_result = data[_RECORD.size:_RECORD.size + result_length].decode()
+        self.playback = None
+        self.celebrate_until = None
+        self.ball_slot = None
+        self.canvas_shown = None
+        self.canvas_rev = 0
+
+    @classmethod
+    def from_snapshot(cls, data):
+        """Build a new GameState from snapshot bytes"""
+        state = cls()
+        state.restore(data)
+        return state
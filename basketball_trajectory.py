@@ -0,0 +1,192 @@
+"""Vectorized trajectory evaluation for the basketball game.
+
+Runs the same physics as `basketball_physics.step()` on NumPy arrays, so M
+candidate shots advance N steps in one call. Used for the aim preview and
+for bulk questions such as "which of these drag vectors score on level 3".
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+import basketball_physics as physics
+from basketball_physics import (
+    BALL_RADIUS, BOUNCE_DAMPENING, FLOOR_Y, FRICTION, GRAVITY, REST_SPEED, WALL_RIGHT
+)
+
+
+class Trajectories(NamedTuple):
+    """Positions of M shots over N steps plus per-segment geometry
+
+    x, y: (M, N + 1) ball top-left corner per step, column 0 is the launch spot
+    lengths, angles: (M, N) segment length in px and direction in degrees
+    scored: (M,) whether the shot went through the hoop within N steps
+    scored_step: (M,) step index of the score, -1 if none
+    active: (M,) shots still in flight after N steps
+    """
+    x: np.ndarray
+    y: np.ndarray
+    lengths: np.ndarray
+    angles: np.ndarray
+    scored: np.ndarray
+    scored_step: np.ndarray
+    active: np.ndarray
+
+
+def launch_velocities(drags):
+    """Vectorized `physics.launch_velocity` for an (M, 2) array of drag vectors"""
+    drags = np.asarray(drags, dtype=np.float64).reshape(-1, 2)
+    dx, dy = drags[:, 0], drags[:, 1]
+    angle = np.arctan2(dy, dx)
+    power = np.minimum(np.sqrt(dx**2 + dy**2) / physics.POWER_DISTANCE, physics.MAX_POWER)
+    return np.cos(angle) * power * physics.SPEED_SCALE, np.sin(angle) * power * physics.SPEED_SCALE
+
+
+def _segment_hits_circle(px, py, dx, dy, cx, cy, radius):
+    """Vectorized segment-vs-circle test, see `physics._segment_hits_circle`"""
+    fx = cx - px
+    fy = cy - py
+    length2 = dx * dx + dy * dy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(length2 > 0, (fx * dx + fy * dy) / length2, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    ex = fx - t * dx
+    ey = fy - t * dy
+    return ex * ex + ey * ey < radius * radius
+
+
+def _step_frames_arrays(x, y, vx, vy, hoop_x, hoop_y, hoop_radius, frames):
+    """Vectorized `physics._step_frames`: closed form for clear paths, frame by frame for the rest"""
+    nx, ny, nvx, nvy = physics.advance_frames(x, y, vx, vy, frames)
+
+    # Same clearance test as the scalar version: floor, walls, then the box around the path
+    y1 = physics.advance_frames(x, y, vx, vy, 1)[1]
+    clear = (np.maximum(y1, ny) < FLOOR_Y) & (nx >= 0) & (nx <= WALL_RIGHT)
+    terminal = GRAVITY * FRICTION / (1.0 - FRICTION)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        apex = np.ceil(np.log(terminal / (terminal - vy)) / np.log(FRICTION)) - 1
+    apex = np.clip(np.where(vy < 0, apex, 0), 0, frames)
+    top = np.minimum(y, ny)
+    for n in (np.maximum(apex - 1, 0), apex, np.minimum(apex + 1, frames)):
+        top = np.minimum(top, physics.advance_frames(x, y, vx, vy, n)[1])
+    left, right = np.minimum(x, nx) + BALL_RADIUS, np.maximum(x, nx) + BALL_RADIUS
+    top, bottom = top + BALL_RADIUS, np.maximum(y, ny) + BALL_RADIUS
+    gap_x = np.maximum(np.maximum(left - hoop_x, hoop_x - right), 0.0)
+    gap_y = np.maximum(np.maximum(top - hoop_y, hoop_y - bottom), 0.0)
+    clear &= gap_x * gap_x + gap_y * gap_y >= hoop_radius * hoop_radius
+    hit = np.zeros(x.shape, dtype=bool)
+    rested = np.zeros(x.shape, dtype=bool)
+
+    # Balls with something within reach take the frames one by one until they finish
+    idx = np.flatnonzero(~clear)
+    hx, hy, hr = (np.broadcast_to(v, x.shape)[idx] for v in (hoop_x, hoop_y, hoop_radius))
+    bx, by, bvx, bvy = x[idx], y[idx], vx[idx], vy[idx]
+    for _ in range(frames):
+        if not idx.size:
+            break
+        bx, by, bvx, bvy, bhit, brested = step_arrays(bx, by, bvx, bvy, hx, hy, hr)
+        nx[idx], ny[idx], nvx[idx], nvy[idx] = bx, by, bvx, bvy
+        hit[idx], rested[idx] = bhit, brested
+        keep = ~(bhit | brested)
+        idx, hx, hy, hr = idx[keep], hx[keep], hy[keep], hr[keep]
+        bx, by, bvx, bvy = bx[keep], by[keep], bvx[keep], bvy[keep]
+    return nx, ny, nvx, nvy, hit, rested
+
+
+def step_arrays(x, y, vx, vy, hoop_x, hoop_y, hoop_radius, dt=1.0):
+    """Vectorized `physics.step()`; hoop values may be scalars or per-ball arrays
+
+    Returns the new x, y, vx, vy and the scored and rested masks.
+    """
+    if dt > 1 and dt == int(dt):
+        return _step_frames_arrays(x, y, vx, vy, hoop_x, hoop_y, hoop_radius, int(dt))
+
+    friction = FRICTION if dt == 1.0 else FRICTION ** dt
+
+    # Gravity, friction and position update
+    nvy = (vy + GRAVITY * dt) * friction
+    nvx = vx * friction
+    nx = x + nvx * dt
+    ny = y + nvy * dt
+
+    # Fraction of the step flown before touching the floor
+    floor = ny >= FLOOR_Y
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reach = np.where(floor & (ny > y), np.maximum(FLOOR_Y - y, 0.0) / (ny - y), 1.0)
+
+    # Falling through the hoop somewhere along the step
+    hit = (nvy > 0) & _segment_hits_circle(
+        x + BALL_RADIUS, y + BALL_RADIUS, nvx * dt * reach, nvy * dt * reach,
+        hoop_x, hoop_y, hoop_radius
+    )
+
+    # Floor bounce at the moment of impact
+    nvy = np.where(floor, -nvy * BOUNCE_DAMPENING, nvy)
+    nvx = np.where(floor, nvx * (FRICTION * 0.9), nvx)
+    ny = np.where(floor, FLOOR_Y + nvy * dt * (1.0 - reach), ny)
+    rested = floor & ~hit & (np.abs(nvx) < REST_SPEED) & (np.abs(nvy) < REST_SPEED + 2 * GRAVITY * dt)
+
+    # Wall bounce, reflecting the overshoot
+    left = nx < 0
+    right = nx > WALL_RIGHT
+    nx = np.where(left, -nx * BOUNCE_DAMPENING, np.where(right, WALL_RIGHT - (nx - WALL_RIGHT) * BOUNCE_DAMPENING, nx))
+    nvx = np.where(left | right, -nvx * BOUNCE_DAMPENING, nvx)
+
+    return nx, ny, nvx, nvy, hit, rested
+
+
+def evaluate(x, y, vx, vy, hoop, steps, dt=1.0, record=True):
+    """Advance M balls by `steps` steps of dt frames; return Trajectories
+
+    Balls that score or come to rest stay frozen at their last position and
+    drop out of the computation. With record=False only the outcome is kept
+    (x, y hold the final positions, lengths and angles are empty).
+    """
+    x, y, vx, vy = np.broadcast_arrays(*(np.array(v, dtype=np.float64, ndmin=1) for v in (x, y, vx, vy)))
+    x, y = x.copy(), y.copy()
+    count = x.shape[0]
+    scored_step = np.full(count, -1)
+
+    # Shots still in flight, compacted
+    idx = np.arange(count)
+    ax, ay, avx, avy = x.copy(), y.copy(), vx.copy(), vy.copy()
+    xs = [x.copy()] if record else None
+    ys = [y.copy()] if record else None
+
+    for i in range(steps):
+        if not idx.size:
+            if record:
+                xs.extend([x] * (steps - i))
+                ys.extend([y] * (steps - i))
+            break
+
+        nx, ny, nvx, nvy, hit, rested = step_arrays(ax, ay, avx, avy, hoop.x, hoop.y, hoop.radius, dt)
+
+        x[idx] = nx
+        y[idx] = ny
+        scored_step[idx[hit]] = i + 1
+        if record:
+            xs.append(x.copy())
+            ys.append(y.copy())
+
+        # Finished shots drop out
+        keep = ~(hit | rested)
+        idx, ax, ay, avx, avy = idx[keep], nx[keep], ny[keep], nvx[keep], nvy[keep]
+
+    active = np.zeros(count, dtype=bool)
+    active[idx] = True
+    if record:
+        xs = np.stack(xs, axis=1)
+        ys = np.stack(ys, axis=1)
+        dxs = np.diff(xs, axis=1)
+        dys = np.diff(ys, axis=1)
+        lengths, angles = np.hypot(dxs, dys), np.degrees(np.arctan2(dys, dxs))
+    else:
+        xs, ys = x, y
+        lengths = angles = np.empty((count, 0))
+    return Trajectories(xs, ys, lengths, angles, scored_step >= 0, scored_step, active)
+
+
+def shots_score(drags, level, steps=physics.MAX_STEPS, dt=1.0, start=physics.BALL_START):
+    """Return an (M,) bool mask of which drag vectors score on a level"""
+    vx, vy = launch_velocities(drags)
+    return evaluate(start[0], start[1], vx, vy, physics.hoop_for(level), steps, dt, record=False).scored
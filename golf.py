@@ -1,8 +1,30 @@
+import json
+import random
+
 import streamlit as st
 st.set_page_config(page_title="Golf Game", layout="wide")
 
 import streamlit.components.v1 as components
 
+import golf_levels
+
+# Levels sent to the page up front; past the last one the pack repeats
+LEVEL_PACK_SIZE = 50
+
+
+@st.cache_data(max_entries=32)
+def level_pack(seed):
+    """The first LEVEL_PACK_SIZE levels of a course, shared by every session on that seed"""
+    return golf_levels.level_pack(seed, 1, LEVEL_PACK_SIZE)
+
+
+# The course seed lives in the URL, so a course can be replayed or shared
+try:
+    seed = int(st.query_params["seed"])
+except (KeyError, ValueError):
+    seed = random.randrange(1 << 31)
+    st.query_params["seed"] = str(seed)
+
 components.html(
 """
 <style>
@@ -33,6 +55,13 @@ const ctx = canvas.getContext("2d");
 // ----------------- GAME CONSTANTS -----------------
 const GAME_WIDTH = 900;
 const GAME_HEIGHT = 500;
+const RESTITUTION = 0.8;
+const REST_SPEED = 0.02;
+
+// Fixed timestep: physics always advances in 60 Hz steps whatever the display rate
+const STEP_MS = 1000 / 60;
+const MAX_SUBSTEPS = 5;     // catch-up steps per frame before the backlog is dropped
+const MAX_FRAME_MS = 250;   // a longer gap (tab switch, debugger) is not replayed
 
 // ----------------- RESPONSIVE SCALE -----------------
 let scale = 1;
@@ -55,14 +84,14 @@ function resizeGame(){
     canvas.style.height = displayHeight + "px";
 }
 
-window.addEventListener("resize", resizeGame);
+window.addEventListener("resize", () => { resizeGame(); wake(); });
 resizeGame();
 
 // ----------------- GAME STATE -----------------
 let level = 1;
 let score = 0;
 
-let ball = { x:150, y:250, vx:0, vy:0, r:12 };
+let ball = { x:150, y:250, vx:0, vy:0, r:12, px:150, py:250 };
 let hole = { x:750, y:250, r:18 };
 
 let friction = 0.985;
@@ -74,33 +103,65 @@ let dragStart = null;
 let dragging = false;
 let dragEnd = null;
 
-// ----------------- OBSTACLES -----------------
-function generateObstacles() {
-    obstacles = [];
-    let count = Math.min(3 + level, 8);
-    for(let i=0;i<count;i++){
-        let w = 15 + Math.random()*10;
-        let h = 50 + Math.random()*80; 
-        let x = 50 + Math.random()*800;
-        let y = 50 + Math.random()*400;
-
-        let dx = x + w/2 - hole.x;
-        let dy = y + h/2 - hole.y;
-        if(Math.sqrt(dx*dx + dy*dy) < hole.r + Math.max(w,h)){
-            i--; 
-            continue;
+// ----------------- BROADPHASE -----------------
+// Obstacles never move within a level, so they are bucketed once into a
+// uniform grid and each frame only tests the cells the ball sweeps through.
+const GRID_CELL = 64;
+const GRID_COLS = Math.ceil(GAME_WIDTH / GRID_CELL);
+const GRID_ROWS = Math.ceil(GAME_HEIGHT / GRID_CELL);
+let grid = [];
+let queryStamp = 0;
+let candidates = [];
+
+function cellRange(x0, y0, x1, y1){
+    return [
+        Math.max(0, Math.floor(x0 / GRID_CELL)), Math.max(0, Math.floor(y0 / GRID_CELL)),
+        Math.min(GRID_COLS - 1, Math.floor(x1 / GRID_CELL)), Math.min(GRID_ROWS - 1, Math.floor(y1 / GRID_CELL))
+    ];
+}
+
+function buildGrid(){
+    grid = [];
+    for(let i=0;i<GRID_COLS*GRID_ROWS;i++) grid.push([]);
+    for(let o of obstacles){
+        const [c0, r0, c1, r1] = cellRange(o.x, o.y, o.x+o.w, o.y+o.h);
+        for(let r=r0;r<=r1;r++) for(let c=c0;c<=c1;c++) grid[r*GRID_COLS+c].push(o);
+    }
+}
+
+// Obstacles in the cells overlapping a box, each once
+function queryGrid(x0, y0, x1, y1){
+    queryStamp++;
+    candidates.length = 0;
+    const [c0, r0, c1, r1] = cellRange(x0, y0, x1, y1);
+    for(let r=r0;r<=r1;r++) for(let c=c0;c<=c1;c++){
+        for(let o of grid[r*GRID_COLS+c]){
+            if(o.stamp !== queryStamp){ o.stamp = queryStamp; candidates.push(o); }
         }
-        obstacles.push({x,y,w,h});
     }
+    return candidates;
 }
 
 // ----------------- LEVEL -----------------
+// Holes and obstacles come seeded and checked for a way to the hole from
+// golf_levels.py, as [x, y, w, h, x, y, ...] per level
+const LEVELS = __LEVEL_PACK__;
+
+function loadLevel(){
+    const next = LEVELS[(level - 1) % LEVELS.length];
+    hole.x = next.hole[0]; hole.y = next.hole[1];
+    obstacles = [];
+    const o = next.obstacles;
+    for(let i=0;i<o.length;i+=4) obstacles.push({x:o[i], y:o[i+1], w:o[i+2], h:o[i+3], stamp:0});
+    buildGrid();
+}
+
 function newLevel() {
     ball.x = 150; ball.y = 250; ball.vx = 0; ball.vy = 0;
-    hole.x = 200 + Math.random() * 600;
-    hole.y = 80 + Math.random() * 300;
-    generateObstacles();
+    ball.px = ball.x; ball.py = ball.y;
     level++;
+    loadLevel();
+    renderStaticLayer();
 }
 
 // ----------------- INPUT -----------------
@@ -147,48 +208,62 @@ function endDrag(evt){
     dragEnd = null;
 }
 
-canvas.addEventListener("mousedown", startDrag);
-canvas.addEventListener("mousemove", moveDrag);
-canvas.addEventListener("mouseup", endDrag);
-
-canvas.addEventListener("touchstart", startDrag);
-canvas.addEventListener("touchmove", moveDrag);
-canvas.addEventListener("touchend", endDrag);
+// Every input wakes the loop for at least one frame
+for(let [type, handler] of [
+    ["mousedown", startDrag], ["mousemove", moveDrag], ["mouseup", endDrag],
+    ["touchstart", startDrag], ["touchmove", moveDrag], ["touchend", endDrag]
+]){
+    canvas.addEventListener(type, evt => { handler(evt); wake(); });
+}
 
 // ----------------- DRAW -----------------
-function drawBackground(){
-    ctx.fillStyle = "#3ebd59";
-    ctx.fillRect(0,0,GAME_WIDTH,GAME_HEIGHT);
-    ctx.fillStyle = "#2e8b47";
-    ctx.fillRect(0,420,GAME_WIDTH,80);
-    ctx.fillStyle="rgba(0,0,0,0.06)";
+function drawBackground(c){
+    c.fillStyle = "#3ebd59";
+    c.fillRect(0,0,GAME_WIDTH,GAME_HEIGHT);
+    c.fillStyle = "#2e8b47";
+    c.fillRect(0,420,GAME_WIDTH,80);
+    c.fillStyle="rgba(0,0,0,0.06)";
     for(let i=0;i<100;i++){
         let x=Math.random()*GAME_WIDTH; let y=Math.random()*GAME_HEIGHT;
-        ctx.fillRect(x,y,2,6);
+        c.fillRect(x,y,2,6);
     }
 }
 
-function drawHole(){
-    ctx.save(); 
-    ctx.translate(hole.x,hole.y);
-    ctx.fillStyle="#006400";
-    ctx.beginPath(); ctx.arc(0,0,hole.r+5,0,Math.PI*2); ctx.fill();
-    ctx.fillStyle="#000";
-    ctx.beginPath(); ctx.arc(0,0,hole.r,0,Math.PI*2); ctx.fill();
-    ctx.strokeStyle="red"; ctx.lineWidth=2;
-    ctx.beginPath(); ctx.moveTo(0,-hole.r-15); ctx.lineTo(0,0); ctx.stroke();
-    ctx.fillStyle="red";
-    ctx.beginPath(); ctx.moveTo(0,-hole.r-15); ctx.lineTo(8,-hole.r-8); ctx.lineTo(0,-hole.r-1); ctx.closePath(); ctx.fill();
-    ctx.restore();
+function drawHole(c){
+    c.save(); 
+    c.translate(hole.x,hole.y);
+    c.fillStyle="#006400";
+    c.beginPath(); c.arc(0,0,hole.r+5,0,Math.PI*2); c.fill();
+    c.fillStyle="#000";
+    c.beginPath(); c.arc(0,0,hole.r,0,Math.PI*2); c.fill();
+    c.strokeStyle="red"; c.lineWidth=2;
+    c.beginPath(); c.moveTo(0,-hole.r-15); c.lineTo(0,0); c.stroke();
+    c.fillStyle="red";
+    c.beginPath(); c.moveTo(0,-hole.r-15); c.lineTo(8,-hole.r-8); c.lineTo(0,-hole.r-1); c.closePath(); c.fill();
+    c.restore();
 }
 
-function drawObstacles(){
-    ctx.fillStyle="#654321";
-    for(let o of obstacles) ctx.fillRect(o.x,o.y,o.w,o.h);
+function drawObstacles(c){
+    c.fillStyle="#654321";
+    for(let o of obstacles) c.fillRect(o.x,o.y,o.w,o.h);
 }
 
-function drawBall(){
-    ctx.save(); ctx.translate(ball.x,ball.y);
+// ----------------- STATIC LAYER -----------------
+// Grass, rough, hole, flag and obstacles only change with the level: drawn
+// once into an offscreen canvas and copied to the screen each frame.
+const staticLayer = document.createElement("canvas");
+staticLayer.width = GAME_WIDTH;
+staticLayer.height = GAME_HEIGHT;
+
+function renderStaticLayer(){
+    const c = staticLayer.getContext("2d");
+    drawBackground(c);
+    drawHole(c);
+    drawObstacles(c);
+}
+
+function drawBall(x, y){
+    ctx.save(); ctx.translate(x,y);
     ctx.fillStyle="white"; ctx.beginPath(); ctx.arc(0,0,ball.r,0,Math.PI*2); ctx.fill();
     ctx.fillStyle="rgba(0,0,0,0.25)";
     ctx.beginPath(); ctx.ellipse(4,6,ball.r*0.6,ball.r*0.3,0,0,Math.PI*2); ctx.fill();
@@ -225,19 +300,94 @@ function drawAimLine(){
 }
 
 // ----------------- COLLISION -----------------
-function collideObstacles(){
-    for(let o of obstacles){
-        if(ball.x+ball.r>o.x && ball.x-ball.r<o.x+o.w &&
-           ball.y+ball.r>o.y && ball.y-ball.r<o.y+o.h){
-            if(ball.x<o.x || ball.x>o.x+o.w) ball.vx*=-0.8;
-            if(ball.y<o.y || ball.y>o.y+o.h) ball.vy*=-0.8;
+// First contact of a circle of radius r moving from (x,y) by (dx,dy) with box o:
+// {t: fraction of the move, nx, ny: contact normal, depth: overlap to push out}, or null.
+function sweepCircleBox(x, y, dx, dy, r, o){
+    // Already overlapping: push out along the shortest way
+    const cx = Math.max(o.x, Math.min(x, o.x+o.w));
+    const cy = Math.max(o.y, Math.min(y, o.y+o.h));
+    const ox = x - cx, oy = y - cy;
+    if(ox*ox + oy*oy < r*r){
+        if(ox || oy){
+            const d = Math.sqrt(ox*ox + oy*oy);
+            return { t:0, nx:ox/d, ny:oy/d, depth:r-d };
+        }
+        // Center inside the box: out through the nearest face
+        const faces = [[x-o.x, -1, 0], [o.x+o.w-x, 1, 0], [y-o.y, 0, -1], [o.y+o.h-y, 0, 1]];
+        faces.sort((a, b) => a[0] - b[0]);
+        return { t:0, nx:faces[0][1], ny:faces[0][2], depth:faces[0][0]+r };
+    }
+
+    // Slab test against the box grown by r
+    let tEnter = 0, tExit = 1, nx = 0, ny = 0;
+    if(dx === 0){
+        if(x < o.x-r || x > o.x+o.w+r) return null;
+    } else {
+        let t1 = (o.x-r-x)/dx, t2 = (o.x+o.w+r-x)/dx, n = -1;
+        if(t1 > t2){ [t1, t2] = [t2, t1]; n = 1; }
+        if(t1 > tEnter){ tEnter = t1; nx = n; ny = 0; }
+        tExit = Math.min(tExit, t2);
+    }
+    if(dy === 0){
+        if(y < o.y-r || y > o.y+o.h+r) return null;
+    } else {
+        let t1 = (o.y-r-y)/dy, t2 = (o.y+o.h+r-y)/dy, n = -1;
+        if(t1 > t2){ [t1, t2] = [t2, t1]; n = 1; }
+        if(t1 > tEnter){ tEnter = t1; nx = 0; ny = n; }
+        tExit = Math.min(tExit, t2);
+    }
+    if(tEnter > tExit) return null;
+
+    // Entering the grown box beside a corner: the real contact is with the rounded corner
+    const hx = x + dx*tEnter, hy = y + dy*tEnter;
+    const kx = hx < o.x ? o.x : (hx > o.x+o.w ? o.x+o.w : null);
+    const ky = hy < o.y ? o.y : (hy > o.y+o.h ? o.y+o.h : null);
+    if(kx !== null && ky !== null){
+        const fx = x - kx, fy = y - ky;
+        const a = dx*dx + dy*dy, b = fx*dx + fy*dy, c = fx*fx + fy*fy - r*r;
+        const disc = b*b - a*c;
+        if(a === 0 || disc < 0) return null;
+        const t = (-b - Math.sqrt(disc)) / a;
+        if(t < 0 || t > 1) return null;
+        return { t, nx:(x + dx*t - kx)/r, ny:(y + dy*t - ky)/r, depth:0 };
+    }
+    if(!nx && !ny) return null;
+    return { t:tEnter, nx, ny, depth:0 };
+}
+
+// Move the ball through the obstacles for one frame, bouncing at each contact
+function moveBall(){
+    let remaining = 1;
+    for(let i=0;i<4 && remaining > 0;i++){
+        const dx = ball.vx*remaining, dy = ball.vy*remaining;
+        const near = queryGrid(
+            Math.min(ball.x, ball.x+dx) - ball.r, Math.min(ball.y, ball.y+dy) - ball.r,
+            Math.max(ball.x, ball.x+dx) + ball.r, Math.max(ball.y, ball.y+dy) + ball.r
+        );
+        let hit = null;
+        for(let o of near){
+            const h = sweepCircleBox(ball.x, ball.y, dx, dy, ball.r, o);
+            if(h && (!hit || h.t < hit.t)) hit = h;
         }
+        if(!hit){ ball.x += dx; ball.y += dy; return; }
+
+        // Advance to the contact, step off the surface and reflect the normal velocity
+        ball.x += dx*hit.t + hit.nx*(hit.depth + 0.01);
+        ball.y += dy*hit.t + hit.ny*(hit.depth + 0.01);
+        const vn = ball.vx*hit.nx + ball.vy*hit.ny;
+        if(vn < 0){
+            ball.vx -= (1 + RESTITUTION)*vn*hit.nx;
+            ball.vy -= (1 + RESTITUTION)*vn*hit.ny;
+        }
+        remaining *= 1 - hit.t;
     }
 }
 
 // ----------------- PHYSICS -----------------
 function physics(){
-    ball.x += ball.vx; ball.y += ball.vy;
+    // Where the step started, for interpolated drawing
+    ball.px = ball.x; ball.py = ball.y;
+    moveBall();
 
     let margin = ball.r + 5;
 
@@ -251,30 +401,64 @@ function physics(){
     if(ball.y > GAME_HEIGHT - 80){ ball.vx *= stickyFriction; ball.vy *= stickyFriction; }
     else { ball.vx *= friction; ball.vy *= friction; }
 
-    collideObstacles();
+    // Friction alone never reaches zero: call it at rest so the loop can sleep
+    if(Math.abs(ball.vx) < REST_SPEED && Math.abs(ball.vy) < REST_SPEED){ ball.vx = 0; ball.vy = 0; }
 
     let dx = ball.x - hole.x; let dy = ball.y - hole.y;
     if(Math.sqrt(dx*dx+dy*dy) < hole.r){ score++; newLevel(); }
 }
 
+// ----------------- SCHEDULER -----------------
+// Frames are only requested while the ball moves. At rest the loop sleeps
+// until input or a resize wakes it, and a hidden tab gets no frames at all.
+let frameRequested = false;
+let lastTime = null;
+let accumulator = 0;
+
+function wake(){
+    if(!frameRequested && !document.hidden){
+        frameRequested = true;
+        requestAnimationFrame(loop);
+    }
+}
+
+document.addEventListener("visibilitychange", () => { if(!document.hidden) wake(); });
+
 // ----------------- MAIN LOOP -----------------
-generateObstacles();
-function loop(){
-    ctx.clearRect(0,0,GAME_WIDTH,GAME_HEIGHT);
-    drawBackground(); 
-    drawHole(); 
-    drawObstacles();
-    drawBall(); 
+loadLevel();
+renderStaticLayer();
+function loop(now){
+    frameRequested = false;
+    let elapsed = lastTime === null ? 0 : Math.min(now - lastTime, MAX_FRAME_MS);
+    lastTime = now;
+
+    // Run as many fixed steps as the elapsed time holds, up to the catch-up budget
+    if(!dragging) accumulator += elapsed;
+    let steps = 0;
+    while(accumulator >= STEP_MS && steps < MAX_SUBSTEPS){
+        physics();
+        accumulator -= STEP_MS;
+        steps++;
+    }
+    // Still behind: skip the rest instead of spiralling, the game slows down for a moment
+    if(accumulator >= STEP_MS) accumulator = 0;
+
+    // Draw the ball between its last two steps; at rest it is exactly where it stopped
+    let moving = !dragging && (ball.vx || ball.vy);
+    let alpha = moving ? accumulator / STEP_MS : 1;
+    ctx.drawImage(staticLayer,0,0);
+    drawBall(ball.px + (ball.x - ball.px) * alpha, ball.py + (ball.y - ball.py) * alpha);
     drawHUD(); 
     drawAimLine();
     drawPowerBar();
-    if(!dragging) physics();
-    requestAnimationFrame(loop);
+
+    if(moving) wake();
+    else { lastTime = null; accumulator = 0; }
 }
-loop();
+wake();
 
 </script>
-""",
+""".replace("__LEVEL_PACK__", json.dumps(level_pack(seed))),
 height=520,
 scrolling=False
 )
@@ -0,0 +1,229 @@
+"""Seeded level generator for the golf game.
+
+A level is a pure function of (seed, level number). The hole is placed
+first, then obstacles are dropped on a jittered grid: each pass visits every
+cell once in a shuffled order, and a fixed number of passes caps the work
+however crowded the level gets. Levels are then flood-filled together,
+a batch at a time, on a coarse grid of ball positions to make sure the ball
+can roll from the tee to the hole; a walled-off layout is redrawn from the
+next sub-seed, and if every redraw fails the obstacles across the straight
+line to the hole are removed.
+
+    python golf_levels.py --levels 10000 --seed 7    # time a pack
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+# Course, in game pixels (must match golf.py)
+GAME_WIDTH = 900
+GAME_HEIGHT = 500
+TEE = (150.0, 250.0)
+BALL_RADIUS = 12
+HOLE_RADIUS = 18
+MAX_OBSTACLES = 200
+
+# Where the ball's centre can go: physics() keeps it this far from the walls and above the rough
+WALL_MARGIN = BALL_RADIUS + 5
+FLOOR_Y = GAME_HEIGHT - 80 - WALL_MARGIN
+
+# Hole and obstacle ranges (obstacles by top-left corner)
+HOLE_X = (200, 800)
+HOLE_Y = (80, 380)
+OBSTACLE_AREA = (50, 50, 850, 450)
+OBSTACLE_W = (15, 25)
+OBSTACLE_H = (50, 130)
+
+# Jittered placement grid: PLACEMENT_PASSES candidates per cell
+PLACEMENT_CELL = 50
+PLACEMENT_PASSES = 4
+
+# Reachability grid spacing in pixels, and redraws before clearing a corridor. The
+# spacing must stay below the smallest obstacle plus a ball on each side (39 px)
+# so that no obstacle fits between two neighbouring free samples.
+REACH_CELL = 12
+MAX_ATTEMPTS = 8
+
+# Levels validated together; bounds the flood-fill arrays to a few MB
+BATCH_SIZE = 256
+
+_COLS = int((GAME_WIDTH - 2 * WALL_MARGIN) // REACH_CELL) + 1
+_ROWS = int((FLOOR_Y - WALL_MARGIN) // REACH_CELL) + 1
+
+
+def obstacle_count(level):
+    """How many obstacles a level asks for"""
+    return min(3 + level, MAX_OBSTACLES)
+
+
+def _draw(seed, levels, attempt):
+    """(holes, obstacles as one (n, 4) x/y/w/h array, level index of each obstacle) for a batch of levels"""
+    x0, y0, x1, y1 = OBSTACLE_AREA
+    cols = (x1 - x0) // PLACEMENT_CELL
+    rows = (y1 - y0) // PLACEMENT_CELL
+    cells = cols * rows
+    # Each level draws from its own (seed, level, attempt) sub-seed, so batching never changes a level
+    holes = np.empty((len(levels), 2))
+    draws = np.empty((len(levels), PLACEMENT_PASSES, cells, 5))
+    for i, level in enumerate(levels):
+        rng = np.random.default_rng([seed, level, attempt])
+        holes[i] = rng.uniform((HOLE_X[0], HOLE_Y[0]), (HOLE_X[1], HOLE_Y[1]))
+        draws[i] = rng.random((PLACEMENT_PASSES, cells, 5))
+    holes = np.round(holes, 1)
+
+    # Each pass is one shuffled visit of every cell with a jittered obstacle in it
+    order = draws[..., 0].argsort(axis=2).reshape(len(levels), -1)
+    x = x0 + (order % cols + draws[..., 1].reshape(len(levels), -1)) * PLACEMENT_CELL
+    y = y0 + (order // cols + draws[..., 2].reshape(len(levels), -1)) * PLACEMENT_CELL
+    w = OBSTACLE_W[0] + draws[..., 3].reshape(len(levels), -1) * (OBSTACLE_W[1] - OBSTACLE_W[0])
+    h = OBSTACLE_H[0] + draws[..., 4].reshape(len(levels), -1) * (OBSTACLE_H[1] - OBSTACLE_H[0])
+
+    # Same keep-out as the game always used: no obstacle centre near the hole or the tee
+    extent = np.maximum(w, h)
+    cx, cy = x + w / 2, y + h / 2
+    keep = (np.hypot(cx - holes[:, :1], cy - holes[:, 1:]) >= HOLE_RADIUS + extent) & \
+           (np.hypot(cx - TEE[0], cy - TEE[1]) >= BALL_RADIUS + extent)
+
+    # The first `obstacle_count` survivors in visiting order
+    counts = np.array([obstacle_count(level) for level in levels])
+    keep &= keep.cumsum(axis=1) <= counts[:, None]
+    owner = np.nonzero(keep)[0]
+    boxes = np.round(np.stack((x[keep], y[keep], w[keep], h[keep]), axis=1), 1)
+    return holes, boxes, owner
+
+
+def _blocked(boxes, owner, layouts):
+    """Per layout, the grid samples where a ball centred there would touch an obstacle"""
+    # Samples inside each ball-inflated box, as half-open index ranges
+    lo = np.ceil((boxes[:, :2] - BALL_RADIUS - WALL_MARGIN) / REACH_CELL)
+    hi = np.floor((boxes[:, :2] + boxes[:, 2:] + BALL_RADIUS - WALL_MARGIN) / REACH_CELL) + 1
+    c0, r0 = np.clip(lo, 0, (_COLS, _ROWS)).astype(int).T
+    c1, r1 = np.clip(hi, 0, (_COLS, _ROWS)).astype(int).T
+
+    # Paint every box of every layout at once: +1/-1 at the corners, then a 2D prefix sum
+    width = _COLS + 1
+    base = owner * (_ROWS + 1) * width
+    corners = np.concatenate((base + r0 * width + c0, base + r1 * width + c1,
+                              base + r0 * width + c1, base + r1 * width + c0))
+    signs = np.repeat((1, 1, -1, -1), len(boxes))
+    paint = np.bincount(corners, signs, layouts * (_ROWS + 1) * width)
+    paint = paint.reshape(layouts, _ROWS + 1, width)
+    return paint.cumsum(1).cumsum(2)[:, :_ROWS, :_COLS] > 0.5
+
+
+def _runs(free):
+    """A label per cell, shared by exactly the free cells of one horizontal run"""
+    layouts, rows, cols = free.shape
+    # A blocked column after each row keeps runs from wrapping onto the next one
+    padded = np.zeros((layouts, rows, cols + 1), dtype=bool)
+    padded[:, :, :cols] = free
+    runs = np.cumsum(~padded.ravel(), dtype=np.int32)
+    return runs.reshape(layouts, rows, cols + 1)[:, :, :cols]
+
+
+def _cells(points):
+    """Row and column of the grid sample nearest each point"""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    col = np.clip(np.rint((points[:, 0] - WALL_MARGIN) / REACH_CELL), 0, _COLS - 1).astype(int)
+    row = np.clip(np.rint((points[:, 1] - WALL_MARGIN) / REACH_CELL), 0, _ROWS - 1).astype(int)
+    return row, col
+
+
+def reachable(holes, boxes, owner):
+    """Per hole, True if the ball can roll from the tee to it around the obstacles `owner` gives it"""
+    free = ~_blocked(boxes, owner, len(holes))
+    index = np.arange(len(holes))
+    start, goal = _cells(TEE), _cells(holes)
+    row_runs = _runs(free)
+    col_runs = _runs(free.transpose(0, 2, 1)).transpose(0, 2, 1)
+
+    # Flood the runs rather than the cells: a free cell links its row run to its column
+    # run, and each sweep crosses every run the reached ones touch
+    row_hit = np.zeros(free.size + len(holes) * _ROWS + 1, dtype=bool)
+    col_hit = np.zeros(free.size + len(holes) * _COLS + 1, dtype=bool)
+    row_hit[row_runs[index, start[0], start[1]][free[index, start[0], start[1]]]] = True
+    goal_runs = row_runs[index, goal[0], goal[1]]
+    goal_free = free[index, goal[0], goal[1]]
+    row_runs, col_runs = row_runs[free], col_runs[free]
+    reached = 0
+    while True:
+        col_hit[col_runs[row_hit[row_runs]]] = True
+        row_hit[row_runs[col_hit[col_runs]]] = True
+        arrived = row_hit[goal_runs] & goal_free
+        count = np.count_nonzero(row_hit)
+        if arrived.all() or count == reached:
+            return arrived
+        reached = count
+
+
+def _clear_corridor(hole, obstacles):
+    """Drop the obstacles a ball rolling straight from the tee to the hole would touch"""
+    tee = np.asarray(TEE)
+    direction = hole - tee
+    lo = obstacles[:, :2] - BALL_RADIUS
+    hi = obstacles[:, :2] + obstacles[:, 2:] + BALL_RADIUS
+
+    # Slab test of the segment against every ball-inflated box at once
+    parallel = direction == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t0 = (lo - tee) / direction
+        t1 = (hi - tee) / direction
+    near = np.where(parallel, -np.inf, np.minimum(t0, t1)).max(axis=1)
+    far = np.where(parallel, np.inf, np.maximum(t0, t1)).min(axis=1)
+    outside = (parallel & ((tee < lo) | (tee > hi))).any(axis=1)
+    hits = ~outside & (near <= far) & (far >= 0) & (near <= 1)
+    return obstacles[~hits]
+
+
+def generate_levels(seed, levels):
+    """Levels as {"hole": [x, y], "obstacles": [x, y, w, h, x, y, ...]}, validated in batches"""
+    levels = list(levels)
+    chosen = {}
+    for i in range(0, len(levels), BATCH_SIZE):
+        pending = levels[i:i + BATCH_SIZE]
+        for attempt in range(MAX_ATTEMPTS):
+            holes, boxes, owner = _draw(seed, pending, attempt)
+            ok = reachable(holes, boxes, owner)
+            split = np.searchsorted(owner, np.arange(1, len(pending)))
+            chosen.update(zip(pending, zip(holes, np.split(boxes, split))))
+            pending = [level for level, good in zip(pending, ok) if not good]
+            if not pending:
+                break
+        for level in pending:
+            hole, obstacles = chosen[level]
+            chosen[level] = hole, _clear_corridor(hole, obstacles)
+    return [
+        {"hole": chosen[level][0].tolist(), "obstacles": chosen[level][1].ravel().tolist()}
+        for level in levels
+    ]
+
+
+def generate_level(seed, level):
+    """One level; the same as its entry in any pack with the same seed"""
+    return generate_levels(seed, [level])[0]
+
+
+def level_pack(seed, first, count):
+    """Levels first .. first + count - 1 for one seed"""
+    return generate_levels(seed, range(first, first + count))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--first", type=int, default=1)
+    parser.add_argument("--levels", type=int, default=10000)
+    parser.add_argument("--output", help="JSON file to write the pack to")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    pack = level_pack(args.seed, args.first, args.levels)
+    elapsed = time.perf_counter() - started
+    obstacles = sum(len(level["obstacles"]) for level in pack) // 4
+    print(f"Generated {len(pack)} levels ({obstacles} obstacles) in {elapsed:.2f}s "
+          f"({len(pack) / elapsed:.0f} levels/s)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(pack, f)
@@ -32,7 +32,7 @@ function resize() {
     canvas.width = window.innerWidth;
     canvas.height = window.innerHeight;
 }
-window.addEventListener("resize", resize);
+window.addEventListener("resize", () => { resize(); wake(); });
 resize();
 
 let level = 1;
@@ -43,9 +43,16 @@ let ball = {
     y: canvas.height - 80,
     r: 12,
     vx: 0,
-    vy: 0
+    vy: 0,
+    px: canvas.width / 2,
+    py: canvas.height - 80
 };
 
+// Fixed timestep: physics always advances in 60 Hz steps whatever the display rate
+const STEP_MS = 1000 / 60;
+const MAX_SUBSTEPS = 5;     // catch-up steps per frame before the backlog is dropped
+const MAX_FRAME_MS = 250;   // a longer gap (tab switch, debugger) is not replayed
+
 let dragging = false;
 let startX = 0;
 let startY = 0;
@@ -71,12 +78,15 @@ function resetBall() {
     ball.y = canvas.height - 80;
     ball.vx = 0;
     ball.vy = 0;
+    ball.px = ball.x;
+    ball.py = ball.y;
 }
 
 canvas.addEventListener("pointerdown", e => {
     dragging = true;
     startX = e.clientX;
     startY = e.clientY;
+    wake();
 });
 
 canvas.addEventListener("pointermove", e => {
@@ -89,15 +99,26 @@ canvas.addEventListener("pointerup", e => {
     const dy = startY - e.clientY;
     ball.vx = dx * 0.08;
     ball.vy = dy * 0.08;
+    wake();
 });
 
 function update() {
+    // Where the step started, for interpolated drawing
+    ball.px = ball.x;
+    ball.py = ball.y;
+
     ball.x += ball.vx;
     ball.y += ball.vy;
 
     ball.vx *= 0.99;
     ball.vy *= 0.99;
 
+    // Friction alone never reaches zero: call it at rest so the loop can sleep
+    if (Math.abs(ball.vx) < 0.02 && Math.abs(ball.vy) < 0.02) {
+        ball.vx = 0;
+        ball.vy = 0;
+    }
+
     if (ball.x < ball.r || ball.x > canvas.width - ball.r) {
         ball.vx *= -1;
     }
@@ -128,7 +149,10 @@ function update() {
     }
 }
 
-function draw() {
+function draw(alpha) {
+    const x = ball.px + (ball.x - ball.px) * alpha;
+    const y = ball.py + (ball.y - ball.py) * alpha;
+
     ctx.clearRect(0, 0, canvas.width, canvas.height);
 
     ctx.fillStyle = "#111";
@@ -136,7 +160,7 @@ function draw() {
 
     ctx.fillStyle = "#00ffcc";
     ctx.beginPath();
-    ctx.arc(ball.x, ball.y, ball.r, 0, Math.PI * 2);
+    ctx.arc(x, y, ball.r, 0, Math.PI * 2);
     ctx.fill();
 
     ctx.fillStyle = "#ff4757";
@@ -158,13 +182,52 @@ function draw() {
     }
 }
 
-function loop() {
-    update();
-    draw();
-    requestAnimationFrame(loop);
+// Frames are only requested while the ball moves. At rest the loop sleeps
+// until input or a resize wakes it, and a hidden tab gets no frames at all.
+let frameRequested = false;
+let lastTime = null;
+let accumulator = 0;
+
+function wake() {
+    if (!frameRequested && !document.hidden) {
+        frameRequested = true;
+        requestAnimationFrame(loop);
+    }
+}
+
+document.addEventListener("visibilitychange", () => {
+    if (!document.hidden) wake();
+});
+
+function loop(now) {
+    frameRequested = false;
+    const elapsed = lastTime === null ? 0 : Math.min(now - lastTime, MAX_FRAME_MS);
+    lastTime = now;
+
+    // Run as many fixed steps as the elapsed time holds, up to the catch-up budget
+    accumulator += elapsed;
+    let steps = 0;
+    while (accumulator >= STEP_MS && steps < MAX_SUBSTEPS) {
+        update();
+        accumulator -= STEP_MS;
+        steps++;
+    }
+    // Still behind: skip the rest instead of spiralling, the game slows down for a moment
+    if (accumulator >= STEP_MS) accumulator = 0;
+
+    // Draw the ball between its last two steps; at rest it is exactly where it stopped
+    const moving = ball.vx || ball.vy;
+    draw(moving ? accumulator / STEP_MS : 1);
+
+    if (moving) {
+        wake();
+    } else {
+        lastTime = null;
+        accumulator = 0;
+    }
 }
 
-loop();
+wake();
 </script>
 </body>
 </html>
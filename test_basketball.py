@@ -0,0 +1,143 @@
+"""Consistency tests for the basketball physics and everything built on it.
+
+The scoring tables use `evaluate`, the tick scheduler `step_arrays`, replay
+the scalar `simulate` and the browser its JavaScript port, so a shot has to
+end the same way in all of them.
+
+    python -m pytest -q test_basketball.py
+"""
+import json
+import os
+import random
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+import basketball_physics as physics
+import basketball_replay as replay
+import basketball_trajectory as trajectory
+from basketball_state import GameState
+
+# No level's hoop can be reached with the current constants, so these sit where shots actually fly
+REACHABLE_HOOPS = [physics.Hoop(500, 320, 20), physics.Hoop(800, 420, 16), physics.Hoop(380, 300, 22)]
+
+COMPONENT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "basketball_component", "index.html")
+
+
+def random_drags(count, seed=0):
+    """Drag vectors from weak to full-power shots, mostly aimed up and towards the hoop"""
+    rng = random.Random(seed)
+    return [(rng.uniform(-50, 300), rng.uniform(-300, 50)) for _ in range(count)]
+
+
+def launch(dx, dy, start=physics.BALL_START):
+    """Ball at `start` with a drag's launch velocity"""
+    return physics.Ball(*start, *physics.launch_velocity(dx, dy))
+
+
+@pytest.mark.parametrize("hoop", REACHABLE_HOOPS + [physics.hoop_for(1)])
+@pytest.mark.parametrize("dt", [2, 3, 8])
+def test_whole_frame_dt_keeps_outcome(hoop, dt):
+    for dx, dy in random_drags(300, seed=dt):
+        fine = physics.simulate(launch(dx, dy), hoop)
+        coarse = physics.simulate(launch(dx, dy), hoop, dt=dt)
+        assert coarse.event == fine.event
+        assert coarse.final == pytest.approx(fine.final, abs=1e-6)
+
+
+def test_reachable_hoops_are_scored():
+    # Guards the tests above against comparing misses only
+    for hoop in REACHABLE_HOOPS:
+        assert any(physics.simulate(launch(dx, dy), hoop).event == physics.SCORED for dx, dy in random_drags(300))
+
+
+@pytest.mark.parametrize("level", sorted(physics.LEVEL_CONFIG))
+def test_shots_score_matches_simulate(level):
+    drags = random_drags(500, seed=level)
+    scored = trajectory.shots_score(drags, level)
+    hoop = physics.hoop_for(level)
+    expected = [physics.simulate(launch(dx, dy), hoop).event == physics.SCORED for dx, dy in drags]
+    assert scored.tolist() == expected
+
+
+@pytest.mark.parametrize("hoop", REACHABLE_HOOPS)
+@pytest.mark.parametrize("dt", [1, 4])
+def test_evaluate_matches_simulate(hoop, dt):
+    drags = random_drags(500, seed=dt)
+    vx, vy = trajectory.launch_velocities(drags)
+    result = trajectory.evaluate(*physics.BALL_START, vx, vy, hoop, physics.MAX_STEPS, dt=dt, record=False)
+    for i, (dx, dy) in enumerate(drags):
+        shot = physics.simulate(launch(dx, dy), hoop)
+        assert result.scored[i] == (shot.event == physics.SCORED)
+        assert (result.x[i], result.y[i]) == pytest.approx(shot.final[:2], abs=1e-6)
+
+
+def test_game_state_round_trip():
+    state = GameState(
+        score=130, level=4, shots_taken=7, shots_made=2, drag_start=(150.0, 400.0),
+        drag_end=(262.5, 301.0), ball_pos=(431.2, 288.9), ball_velocity=(9.5, -3.25),
+        ball_in_motion=True, show_trajectory=True, last_shot_result="Try to aim higher",
+        client_playback=False, canvas_rev=12
+    )
+    restored = GameState.from_snapshot(state.snapshot())
+    for field in ("score", "level", "shots_taken", "shots_made", "game_active", "drag_start", "drag_end",
+                  "ball_pos", "ball_velocity", "ball_in_motion", "show_trajectory", "last_shot_result",
+                  "client_playback"):
+        assert getattr(restored, field) == getattr(state, field), field
+    # Transient fields start over
+    assert restored.canvas_rev == 0 and restored.canvas_shown is None
+
+
+def test_game_state_round_trip_without_drag():
+    restored = GameState.from_snapshot(GameState().snapshot())
+    assert restored.drag_start is None and restored.drag_end is None
+    assert restored == GameState()
+
+
+def test_replay_verifies_generated_log(tmp_path):
+    path = str(tmp_path / "shots.bin")
+    log = replay.ShotLog(path)
+    for i, (dx, dy) in enumerate(random_drags(200)):
+        level = 1 + i % len(physics.LEVEL_CONFIG)
+        shot = physics.simulate(launch(dx, dy), physics.hoop_for(level))
+        log.append(7, level, physics.BALL_START, dx, dy, shot)
+    log.close()
+
+    records = list(replay.read_log(path))
+    assert len(records) == 200
+    assert replay.verify(records) == []
+
+    # A tampered outcome is reported
+    records[0] = records[0]._replace(steps=records[0].steps + 1)
+    assert [record for record, _ in replay.verify(records)] == [records[0]]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_component_preview_matches_simulate():
+    html = open(COMPONENT_PATH).read()
+    code = html[html.index("function segmentHitsCircle"):html.index("function drawPreview")]
+    steps = 400
+    preview_physics = {
+        "gravity": physics.GRAVITY, "friction": physics.FRICTION, "bounce": physics.BOUNCE_DAMPENING,
+        "floorY": physics.FLOOR_Y, "wallRight": physics.WALL_RIGHT, "powerDistance": physics.POWER_DISTANCE,
+        "maxPower": physics.MAX_POWER, "speedScale": physics.SPEED_SCALE, "ballRadius": physics.BALL_RADIUS,
+        "restSpeed": physics.REST_SPEED, "previewSteps": steps
+    }
+    cases = [(list(hoop), dx, dy) for hoop in REACHABLE_HOOPS for dx, dy in random_drags(100)]
+    script = code + f"""
+const out = [];
+for (const [hoop, dx, dy] of {json.dumps(cases)}) {{
+    globalThis.args = {{physics: {json.dumps(preview_physics)}, hoop, ball: {json.dumps(physics.BALL_START)}}};
+    out.push(previewPoints(dx, dy));
+}}
+console.log(JSON.stringify(out));
+"""
+    output = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout
+    for (hoop, dx, dy), points in zip(cases, json.loads(output)):
+        shot = physics.simulate(launch(dx, dy), physics.Hoop(*hoop), max_steps=steps - 1)
+        expected = [v + physics.BALL_RADIUS for frame in shot.frames for v in frame]
+        # simulate() rounds its frames to 0.1 px
+        assert len(points) == len(expected)
+        assert np.allclose(points, expected, atol=0.051)